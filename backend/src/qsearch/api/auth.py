@@ -5,17 +5,25 @@ Users register with email/password, login to get a session.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import uuid
+import hmac
 import logging
+import threading
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, EmailStr
-from sqlalchemy import text
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy import DateTime, Integer, String, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from qsearch.api.deps import get_config
-from qsearch.index.storage import DocumentStore
+from qsearch.api.deps import get_async_db
+from qsearch.api.entropy import new_uuid
+from qsearch.api.tokens import issue_token, revoke_token, verify_token
 
 router = APIRouter(prefix="/api/v1/auth")
 _log = logging.getLogger("qsearch.auth")
@@ -43,25 +51,270 @@ CREATE TABLE IF NOT EXISTS saved_searches (
     created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches(user_id);
+-- UNIQUE(email) already indexes email; this one covers every column LOGIN_SQL
+-- reads, so a login is an index-only scan (it supersedes the narrower
+-- idx_users_email_covering)
+CREATE INDEX IF NOT EXISTS idx_users_email_login
+    ON users(email) INCLUDE (id, user_id, password_hash, name, created_at);
+DROP INDEX IF EXISTS idx_users_email_covering;
+DROP INDEX IF EXISTS idx_users_email;
+-- Saved searches are keyed by the integer users.id; the UUID column is kept
+-- for external consumers only.
+ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS user_uid INTEGER REFERENCES users(id);
+UPDATE saved_searches s SET user_uid = u.id
+    FROM users u WHERE s.user_uid IS NULL AND u.user_id = s.user_id;
+CREATE INDEX IF NOT EXISTS idx_saved_searches_uid ON saved_searches(user_uid, created_at DESC);
+DROP INDEX IF EXISTS idx_saved_searches_user;
 """
 
+# The same schema for SQLite (the default local database), one statement per
+# execute. There is no legacy saved_searches layout to migrate there.
+USERS_TABLE_SQLITE = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        user_id VARCHAR(64) NOT NULL UNIQUE,
+        email VARCHAR(256) NOT NULL UNIQUE,
+        password_hash VARCHAR(128) NOT NULL,
+        name VARCHAR(128),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_login_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS saved_searches (
+        id INTEGER PRIMARY KEY,
+        user_id VARCHAR(64) NOT NULL REFERENCES users(user_id),
+        user_uid INTEGER REFERENCES users(id),
+        query TEXT NOT NULL,
+        results_count INTEGER,
+        search_mode VARCHAR(32),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_saved_searches_uid"
+    " ON saved_searches(user_uid, created_at DESC)",
+)
+
+
+_users_table_ready = False
+
 
 def ensure_users_table(session):
+    """Run the users DDL once per process (called from app startup)."""
+    global _users_table_ready
+    if _users_table_ready:
+        return
     try:
-        session.execute(text(USERS_TABLE_SQL))
+        if session.get_bind().dialect.name == "sqlite":
+            for stmt in USERS_TABLE_SQLITE:
+                session.execute(text(stmt))
+        else:
+            session.execute(text(USERS_TABLE_SQL))
         session.commit()
+        _users_table_ready = True
     except Exception as e:
         _log.warning("Could not create users table: %s", e)
         session.rollback()
 
 
-def hash_password(password: str, salt: str = "") -> str:
-    """Simple password hashing with SHA-256."""
+# === Statements ===
+
+# Built once at import with typed binds, so each request reuses the same
+# TextClause (and its compiled-cache entry) instead of re-parsing the SQL.
+# CURRENT_TIMESTAMP rather than NOW() and typed created_at columns keep them
+# valid on SQLite, whose driver hands timestamps back as strings.
+
+SELECT_USER_SQL = (
+    text("SELECT user_id, email, name, created_at FROM users WHERE id = :uid")
+    .bindparams(bindparam("uid", type_=Integer))
+    .columns(created_at=DateTime)
+)
+
+INSERT_USER_SQL = (
+    text(
+        """
+    INSERT INTO users (user_id, email, password_hash, name, created_at)
+    VALUES (:user_id, :email, :password_hash, :name, CURRENT_TIMESTAMP)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id, user_id, email, name, created_at
+"""
+    )
+    .bindparams(
+        bindparam("user_id", type_=String),
+        bindparam("email", type_=String),
+        bindparam("password_hash", type_=String),
+        bindparam("name", type_=String),
+    )
+    .columns(created_at=DateTime)
+)
+
+LOGIN_SQL = (
+    text(
+        """
+    SELECT id, user_id, email, password_hash, name, created_at
+    FROM users WHERE email = :email
+"""
+    )
+    .bindparams(bindparam("email", type_=String))
+    .columns(created_at=DateTime)
+)
+
+TOUCH_LOGIN_SQL = text(
+    "UPDATE users SET last_login_at = CURRENT_TIMESTAMP WHERE id = :uid"
+).bindparams(bindparam("uid", type_=Integer))
+
+UPDATE_PASSWORD_HASH_SQL = text(
+    "UPDATE users SET password_hash = :password_hash WHERE user_id = :user_id"
+).bindparams(
+    bindparam("password_hash", type_=String),
+    bindparam("user_id", type_=String),
+)
+
+SAVE_SEARCH_SQL = text(
+    """
+    INSERT INTO saved_searches (user_uid, user_id, query, results_count, search_mode, created_at)
+    VALUES (:uid, :user_id, :query, :results_count, :search_mode, CURRENT_TIMESTAMP)
+"""
+).bindparams(
+    bindparam("uid", type_=Integer),
+    bindparam("user_id", type_=String),
+    bindparam("query", type_=String),
+    bindparam("results_count", type_=Integer),
+    bindparam("search_mode", type_=String),
+)
+
+LIST_SEARCHES_SQL = (
+    text(
+        """
+    SELECT id, query, results_count, search_mode, created_at
+    FROM saved_searches
+    WHERE user_uid = :uid
+    ORDER BY created_at DESC
+    LIMIT 50
+"""
+    )
+    .bindparams(bindparam("uid", type_=Integer))
+    .columns(created_at=DateTime)
+)
+
+DELETE_SEARCH_SQL = text(
+    "DELETE FROM saved_searches WHERE id = :search_id AND user_uid = :uid"
+).bindparams(
+    bindparam("search_id", type_=Integer),
+    bindparam("uid", type_=Integer),
+)
+
+
+# Argon2id with the OWASP-recommended minimum parameters (19 MiB, t=2, p=1).
+_ph = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Verified against when the email is unknown so both failure paths cost one KDF.
+_DUMMY_HASH = _ph.hash("qsearch-dummy-password")
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with Argon2id (salt is generated and embedded)."""
+    return _ph.hash(password)
+
+
+def _legacy_hash_password(password: str, salt: str) -> str:
+    """Pre-Argon2 scheme: SHA-256 over password + user_id."""
     return hashlib.sha256((password + salt).encode()).hexdigest()
 
 
+def verify_password(stored_hash: str, password: str, user_id: str) -> bool:
+    """Check a password against a stored Argon2 (or legacy SHA-256) hash."""
+    if not stored_hash.startswith("$argon2"):
+        return hmac.compare_digest(
+            stored_hash, _legacy_hash_password(password, user_id)
+        )
+    try:
+        return _ph.verify(stored_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    if not stored_hash.startswith("$argon2"):
+        return True
+    return _ph.check_needs_rehash(stored_hash)
+
+
+# === User cache ===
+
+# Profiles are near-immutable, so authenticated calls can skip the users lookup.
+_user_cache: TTLCache = TTLCache(maxsize=50_000, ttl=60)
+_user_cache_lock = threading.RLock()
+
+
+def _profile(row) -> dict[str, Any]:
+    return {
+        "user_id": row["user_id"],
+        "email": row["email"],
+        "name": row["name"],
+        "created_at": (row["created_at"].isoformat() if row["created_at"] else None),
+    }
+
+
+async def get_user(session: AsyncSession, uid: int) -> dict[str, Any] | None:
+    """Return the public profile for users.id `uid`, or None if it no longer exists."""
+    with _user_cache_lock:
+        user = _user_cache.get(uid)
+    if user is not None:
+        return user
+
+    result = await session.execute(SELECT_USER_SQL, {"uid": uid})
+    row = result.mappings().fetchone()
+    if not row:
+        return None
+
+    user = _profile(row)
+    with _user_cache_lock:
+        _user_cache[uid] = user
+    return user
+
+
+def invalidate_user(uid: int | None) -> None:
+    if not uid:
+        return
+    with _user_cache_lock:
+        _user_cache.pop(uid, None)
+
+
+def _request_token(request: Request) -> str | None:
+    """Bearer token from the Authorization header, else the session's token."""
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return request.session.get("token")
+
+
+async def current_user(
+    request: Request, session: AsyncSession
+) -> tuple[int, dict[str, Any]] | None:
+    """Resolve the caller to (uid, profile), if still valid.
+
+    A valid access token answers without touching the database. Once the
+    session's token has expired, the profile is reloaded by `uid` and a fresh
+    token is minted into the session.
+    """
+    token = _request_token(request)
+    if token:
+        claims = await verify_token(token)
+        if claims is not None:
+            return claims["uid"], claims["user"]
+
+    uid = request.session.get("uid")
+    if not uid:
+        return None
+    user = await get_user(session, uid)
+    if user is None:
+        return None
+    request.session["token"] = issue_token(uid, user)
+    return uid, user
+
+
 # === Models ===
 
 
@@ -82,13 +335,16 @@ class SaveSearchRequest(BaseModel):
     search_mode: str = "hybrid"
 
 
+class SaveSearchBatchRequest(BaseModel):
+    items: list[SaveSearchRequest] = Field(..., max_length=500)
+
+
 # === Routes ===
 
 
-@router.get("/providers")
-def providers() -> dict[str, Any]:
-    """Return available auth providers (just local DB auth)."""
-    return {
+# Fixed for the life of the process, so encode it once.
+_PROVIDERS_BODY = orjson.dumps(
+    {
         "enabled": True,
         "providers": {
             "local": True,
@@ -96,237 +352,238 @@ def providers() -> dict[str, Any]:
             "microsoft": False,
         },
     }
+)
+
+
+@router.get("/providers")
+def providers() -> Response:
+    """Return available auth providers (just local DB auth)."""
+    return Response(
+        content=_PROVIDERS_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "max-age=60"},
+    )
 
 
 @router.post("/register")
-def register(req: RegisterRequest, request: Request):
+async def register(
+    req: RegisterRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_async_db),
+):
     """Register a new user with email/password."""
     if len(req.password) < 6:
         raise HTTPException(400, "Password must be at least 6 characters")
 
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_users_table(session)
-
-        # Check if email exists
-        result = session.execute(
-            text("SELECT id FROM users WHERE email = :email"), {"email": req.email}
-        )
-        if result.fetchone():
-            raise HTTPException(400, "Email already registered")
+    user_id = str(new_uuid())
+    password_hash = await asyncio.to_thread(hash_password, req.password)
+
+    # Single atomic round-trip: the UNIQUE(email) constraint decides duplicates
+    result = await session.execute(
+        INSERT_USER_SQL,
+        {
+            "user_id": user_id,
+            "email": req.email,
+            "password_hash": password_hash,
+            "name": req.name or req.email.split("@")[0],
+        },
+    )
+    row = result.mappings().fetchone()
+    if row is None:
+        raise HTTPException(400, "Email already registered")
+    await session.commit()
 
-        user_id = str(uuid.uuid4())
-        password_hash = hash_password(req.password, user_id)
+    user = _profile(row)
+    token = issue_token(row["id"], user)
 
-        session.execute(
-            text(
-                """
-            INSERT INTO users (user_id, email, password_hash, name, created_at)
-            VALUES (:user_id, :email, :password_hash, :name, NOW())
-        """
-            ),
-            {
-                "user_id": user_id,
-                "email": req.email,
-                "password_hash": password_hash,
-                "name": req.name or req.email.split("@")[0],
-            },
-        )
-        session.commit()
+    # Set session
+    request.session["user_id"] = user_id
+    request.session["uid"] = row["id"]
+    request.session["token"] = token
 
-        # Set session
-        request.session["user_id"] = user_id
-
-        return {
-            "ok": True,
-            "message": "Registration successful",
-            "user": {
-                "user_id": user_id,
-                "email": req.email,
-                "name": req.name or req.email.split("@")[0],
-            },
-        }
+    return {
+        "ok": True,
+        "message": "Registration successful",
+        "user": {
+            "user_id": user_id,
+            "email": req.email,
+            "name": req.name or req.email.split("@")[0],
+        },
+        "access_token": token,
+        "token_type": "bearer",
+    }
 
 
 @router.post("/login")
-def login(req: LoginRequest, request: Request):
+async def login(
+    req: LoginRequest, request: Request, session: AsyncSession = Depends(get_async_db)
+):
     """Login with email/password."""
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_users_table(session)
-
-        result = session.execute(
-            text(
-                "SELECT user_id, email, password_hash, name FROM users WHERE email = :email"
-            ),
-            {"email": req.email},
+    # Plain read first: a failed attempt must not lock (or write) the user row
+    # while the KDF runs.
+    result = await session.execute(LOGIN_SQL, {"email": req.email})
+    row = result.mappings().fetchone()
+
+    if row is None:
+        # Burn the same KDF time as a real check to avoid user enumeration
+        await asyncio.to_thread(verify_password, _DUMMY_HASH, req.password, "")
+        raise HTTPException(401, "Invalid email or password")
+
+    password_ok = await asyncio.to_thread(
+        verify_password, row["password_hash"], req.password, row["user_id"]
+    )
+    if not password_ok:
+        raise HTTPException(401, "Invalid email or password")
+
+    await session.execute(TOUCH_LOGIN_SQL, {"uid": row["id"]})
+
+    # Transparently upgrade legacy SHA-256 hashes to Argon2
+    if needs_rehash(row["password_hash"]):
+        new_hash = await asyncio.to_thread(hash_password, req.password)
+        await session.execute(
+            UPDATE_PASSWORD_HASH_SQL,
+            {"user_id": row["user_id"], "password_hash": new_hash},
         )
-        row = result.mappings().fetchone()
 
-        if not row:
-            raise HTTPException(401, "Invalid email or password")
+    token = issue_token(row["id"], _profile(row))
 
-        expected_hash = hash_password(req.password, row["user_id"])
-        if row["password_hash"] != expected_hash:
-            raise HTTPException(401, "Invalid email or password")
+    # Set session
+    request.session["user_id"] = row["user_id"]
+    request.session["uid"] = row["id"]
+    request.session["token"] = token
 
-        # Update last login
-        session.execute(
-            text("UPDATE users SET last_login_at = NOW() WHERE user_id = :user_id"),
-            {"user_id": row["user_id"]},
-        )
-
-        # Set session
-        request.session["user_id"] = row["user_id"]
-
-        return {
-            "ok": True,
-            "message": "Login successful",
-            "user": {
-                "user_id": row["user_id"],
-                "email": row["email"],
-                "name": row["name"],
-            },
-        }
+    return {
+        "ok": True,
+        "message": "Login successful",
+        "user": {
+            "user_id": row["user_id"],
+            "email": row["email"],
+            "name": row["name"],
+        },
+        "access_token": token,
+        "token_type": "bearer",
+    }
 
 
 @router.post("/logout")
-def logout(request: Request):
-    """Clear session."""
+async def logout(request: Request):
+    """Clear session and revoke its access token."""
+    await revoke_token(_request_token(request))
+    await revoke_token(request.session.get("token"))
+    invalidate_user(request.session.get("uid"))
     request.session.clear()
     return {"ok": True}
 
 
 @router.get("/me")
-def me(request: Request):
+async def me(request: Request, session: AsyncSession = Depends(get_async_db)):
     """Get current authenticated user."""
-    user_id = request.session.get("user_id")
-    if not user_id:
+    found = await current_user(request, session)
+    if found is None:
+        request.session.clear()
         return {"authenticated": False}
 
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_users_table(session)
-
-        result = session.execute(
-            text(
-                "SELECT user_id, email, name, created_at FROM users WHERE user_id = :user_id"
-            ),
-            {"user_id": user_id},
-        )
-        row = result.mappings().fetchone()
-
-        if not row:
-            request.session.clear()
-            return {"authenticated": False}
-
-        return {
-            "authenticated": True,
-            "user": {
-                "user_id": row["user_id"],
-                "email": row["email"],
-                "name": row["name"],
-                "created_at": (
-                    row["created_at"].isoformat() if row["created_at"] else None
-                ),
-            },
-        }
+    return {"authenticated": True, "user": found[1]}
 
 
 # === Saved Searches ===
 
 
 @router.post("/searches/save")
-def save_search(req: SaveSearchRequest, request: Request):
+async def save_search(
+    req: SaveSearchRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_async_db),
+):
     """Save a search for the authenticated user."""
-    user_id = request.session.get("user_id")
-    if not user_id:
+    found = await current_user(request, session)
+    if found is None:
         raise HTTPException(401, "Not authenticated")
+    uid, user = found
+
+    await session.execute(
+        SAVE_SEARCH_SQL,
+        {
+            "uid": uid,
+            "user_id": user["user_id"],
+            "query": req.query,
+            "results_count": req.results_count,
+            "search_mode": req.search_mode,
+        },
+    )
 
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_users_table(session)
+    return {"ok": True, "message": "Search saved"}
 
-        session.execute(
-            text(
-                """
-            INSERT INTO saved_searches (user_id, query, results_count, search_mode, created_at)
-            VALUES (:user_id, :query, :results_count, :search_mode, NOW())
-        """
-            ),
-            {
-                "user_id": user_id,
-                "query": req.query,
-                "results_count": req.results_count,
-                "search_mode": req.search_mode,
-            },
+
+@router.post("/searches/save_batch")
+async def save_search_batch(
+    req: SaveSearchBatchRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Save several searches for the authenticated user in one round-trip."""
+    found = await current_user(request, session)
+    if found is None:
+        raise HTTPException(401, "Not authenticated")
+    uid, user = found
+
+    if req.items:
+        # A list of parameter dicts makes SQLAlchemy issue an executemany
+        await session.execute(
+            SAVE_SEARCH_SQL,
+            [
+                {
+                    "uid": uid,
+                    "user_id": user["user_id"],
+                    "query": item.query,
+                    "results_count": item.results_count,
+                    "search_mode": item.search_mode,
+                }
+                for item in req.items
+            ],
         )
 
-        return {"ok": True, "message": "Search saved"}
+    return {"ok": True, "message": "Searches saved", "count": len(req.items)}
 
 
 @router.get("/searches")
-def list_searches(request: Request):
+async def list_searches(
+    request: Request, session: AsyncSession = Depends(get_async_db)
+):
     """List saved searches for the authenticated user."""
-    user_id = request.session.get("user_id")
-    if not user_id:
+    found = await current_user(request, session)
+    if found is None:
         raise HTTPException(401, "Not authenticated")
-
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_users_table(session)
-
-        result = session.execute(
-            text(
-                """
-            SELECT id, query, results_count, search_mode, created_at
-            FROM saved_searches
-            WHERE user_id = :user_id
-            ORDER BY created_at DESC
-            LIMIT 50
-        """
+    uid, _ = found
+
+    result = await session.execute(LIST_SEARCHES_SQL, {"uid": uid})
+
+    searches = [
+        {
+            "id": row["id"],
+            "query": row["query"],
+            "results_count": row["results_count"],
+            "search_mode": row["search_mode"],
+            "created_at": (
+                row["created_at"].isoformat() if row["created_at"] else None
             ),
-            {"user_id": user_id},
-        )
-
-        searches = [
-            {
-                "id": row["id"],
-                "query": row["query"],
-                "results_count": row["results_count"],
-                "search_mode": row["search_mode"],
-                "created_at": (
-                    row["created_at"].isoformat() if row["created_at"] else None
-                ),
-            }
-            for row in result.mappings()
-        ]
+        }
+        for row in result.mappings()
+    ]
 
-        return {"searches": searches}
+    return {"searches": searches}
 
 
 @router.delete("/searches/{search_id}")
-def delete_search(search_id: int, request: Request):
+async def delete_search(
+    search_id: int, request: Request, session: AsyncSession = Depends(get_async_db)
+):
     """Delete a saved search."""
-    user_id = request.session.get("user_id")
-    if not user_id:
+    found = await current_user(request, session)
+    if found is None:
         raise HTTPException(401, "Not authenticated")
+    uid, _ = found
 
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        session.execute(
-            text(
-                """
-            DELETE FROM saved_searches WHERE id = :search_id AND user_id = :user_id
-        """
-            ),
-            {"search_id": search_id, "user_id": user_id},
-        )
+    await session.execute(DELETE_SEARCH_SQL, {"search_id": search_id, "uid": uid})
 
-        return {"ok": True}
+    return {"ok": True}
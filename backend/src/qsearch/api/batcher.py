@@ -0,0 +1,95 @@
+"""
+Request batching for `/search`.
+
+Concurrent searches are queued and drained together into a single
+`SearchOrchestrator.search_batch` call, so N in-flight queries share one
+encode pass, one matrix scan over the index and one document fetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+
+from qsearch.search.orchestrator import SearchOrchestrator, SearchResult
+
+_log = logging.getLogger("qsearch.api")
+
+_Item = tuple[str, int, "asyncio.Future[list[SearchResult]]"]
+
+
+class SearchBatcher:
+    def __init__(
+        self,
+        orchestrator: SearchOrchestrator,
+        *,
+        max_batch: int = 32,
+        max_wait_ms: int = 10,
+    ):
+        self.orchestrator = orchestrator
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue: asyncio.Queue[_Item] | None = None
+        self._task: asyncio.Task | None = None
+
+    def _ensure_started(self) -> asyncio.Queue[_Item]:
+        # Started lazily so the queue and worker bind to the serving loop.
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def search(self, query: str, limit: int) -> list[SearchResult]:
+        queue = self._ensure_started()
+        fut: asyncio.Future[list[SearchResult]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        await queue.put((query, limit, fut))
+        return await fut
+
+    async def _collect(self, queue: asyncio.Queue[_Item]) -> list[_Item]:
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                # Window closed: still take whatever is already waiting
+                if queue.empty():
+                    break
+                batch.append(queue.get_nowait())
+                continue
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            queries = [q for q, _, _ in batch]
+            limits = [limit for _, limit, _ in batch]
+            try:
+                # Index scan and document fetch are blocking; keep the loop free
+                results = await asyncio.to_thread(
+                    self.orchestrator.search_batch, queries, limits
+                )
+            except Exception as exc:
+                _log.exception("search batch of %s failed", len(batch))
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, _, fut), res in zip(batch, results, strict=True):
+                if not fut.done():
+                    fut.set_result(res)
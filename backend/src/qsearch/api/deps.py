@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from functools import lru_cache
 
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from qsearch.api.batcher import SearchBatcher
 from qsearch.cache import SearchCache
 from qsearch.config import QSearchConfig
+from qsearch.index.storage import DocumentStore, set_sqlite_pragmas
 from qsearch.search.orchestrator import SearchOrchestrator
 
 
@@ -12,13 +24,100 @@ def get_config() -> QSearchConfig:
     return QSearchConfig.from_env()
 
 
+@lru_cache(maxsize=4)
+def get_store(db_url: str) -> DocumentStore:
+    """One DocumentStore (and so one engine + connection pool) per database."""
+    return DocumentStore(db_url)
+
+
+def _async_db_url(db_url: str) -> str:
+    if db_url.startswith("postgresql+psycopg2://"):
+        return db_url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    return db_url
+
+
+@lru_cache(maxsize=4)
+def get_async_engine(db_url: str) -> AsyncEngine:
+    """Async engine (asyncpg on Postgres) for the auth/federation routes."""
+    engine_kwargs = {}
+    if not db_url.startswith("sqlite"):
+        engine_kwargs.update(
+            pool_pre_ping=True,
+            pool_size=20,
+            max_overflow=10,
+            json_deserializer=orjson.loads,
+        )
+    if db_url.startswith("postgresql"):
+        # asyncpg prepares every statement; keep the plans of all hot routes
+        # cached per connection so repeat calls skip parse/plan server-side.
+        engine_kwargs["connect_args"] = {"prepared_statement_cache_size": 500}
+    engine = create_async_engine(_async_db_url(db_url), **engine_kwargs)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+@lru_cache(maxsize=4)
+def get_async_sessionmaker(db_url: str) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_async_engine(db_url), expire_on_commit=False)
+
+
+@lru_cache(maxsize=4)
+def get_autocommit_sessionmaker(db_url: str) -> async_sessionmaker[AsyncSession]:
+    """Sessions on the same pool with no BEGIN/COMMIT around each statement."""
+    engine = get_async_engine(db_url).execution_options(isolation_level="AUTOCOMMIT")
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency yielding an AsyncSession, committed on success."""
+    sessionmaker = get_async_sessionmaker(get_config().db_url)
+    async with sessionmaker() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_autocommit_db() -> AsyncIterator[AsyncSession]:
+    """AsyncSession for single-statement writes: each statement commits itself,
+    saving the separate BEGIN and COMMIT round-trips."""
+    sessionmaker = get_autocommit_sessionmaker(get_config().db_url)
+    async with sessionmaker() as session:
+        yield session
+
+
 @lru_cache
 def get_orchestrator() -> SearchOrchestrator:
     cfg = get_config()
-    return SearchOrchestrator(db_url=cfg.db_url)
+    return SearchOrchestrator(
+        store=get_store(cfg.db_url),
+        quantize=cfg.index_int8,
+        snapshot_dir=cfg.index_snapshot_dir,
+        snapshot_seconds=cfg.index_snapshot_seconds,
+        ann=cfg.index_ann,
+    )
+
+
+@lru_cache
+def get_search_batcher() -> SearchBatcher:
+    cfg = get_config()
+    return SearchBatcher(
+        get_orchestrator(),
+        max_batch=cfg.search_batch_size,
+        max_wait_ms=cfg.search_batch_wait_ms,
+    )
 
 
 @lru_cache
 def get_cache() -> SearchCache:
     cfg = get_config()
-    return SearchCache(redis_url=cfg.redis_url, ttl_seconds=cfg.cache_ttl_seconds)
+    return SearchCache(
+        redis_url=cfg.redis_url,
+        ttl_seconds=cfg.cache_ttl_seconds,
+        memory_ttl_seconds=cfg.cache_memory_ttl_seconds,
+    )
@@ -0,0 +1,46 @@
+"""
+Buffered OS entropy for identifiers and API keys.
+
+uuid4() and secrets.token_hex() each cost one getrandom() syscall. Under bulk
+provisioning we instead pull 4 KiB from os.urandom at a time and slice it.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+
+_POOL_REFILL = 4096
+
+_pool = bytearray()
+_pool_lock = threading.Lock()
+
+
+def _reset_pool() -> None:
+    # A forked worker must never hand out bytes its parent (or siblings) saw.
+    global _pool_lock
+    _pool.clear()
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pool)
+
+
+def rand_bytes(n: int) -> bytes:
+    """Return `n` bytes from the OS CSPRNG, served from a shared buffer."""
+    with _pool_lock:
+        if len(_pool) < n:
+            _pool.extend(os.urandom(max(_POOL_REFILL, n)))
+        out = bytes(_pool[:n])
+        del _pool[:n]
+    return out
+
+
+def new_uuid() -> uuid.UUID:
+    """Random (version 4) UUID drawn from the entropy buffer."""
+    return uuid.UUID(bytes=rand_bytes(16), version=4)
+
+
+def token_hex(nbytes: int = 32) -> str:
+    return rand_bytes(nbytes).hex()
@@ -8,18 +8,21 @@ external API functionality for the UI.
 
 from __future__ import annotations
 
-import secrets
+import hashlib
 import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Depends, Response
 from pydantic import BaseModel, Field
-from sqlalchemy import text
+from sqlalchemy import Integer, LargeBinary, String, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from qsearch.api.deps import get_config
-from qsearch.index.storage import DocumentStore
+from qsearch.api.deps import get_async_db, get_autocommit_db
+from qsearch.api.entropy import token_hex
 
 router = APIRouter(prefix="/federation", tags=["federation"])
 _log = logging.getLogger("qsearch.federation")
@@ -37,6 +40,17 @@ class CreateKeyRequest(BaseModel):
     rate_limit: int = Field(default=120, ge=1, le=1000)
 
 
+class RegisterInstanceRequest(BaseModel):
+    name: str
+    endpoint: str
+    api_key: str
+    capabilities: list[str] = Field(default_factory=list)
+
+
+class RegisterInstanceBatchRequest(BaseModel):
+    items: list[RegisterInstanceRequest] = Field(..., max_length=500)
+
+
 class ApiKeyResponse(BaseModel):
     id: int
     name: str
@@ -80,9 +94,9 @@ SETUP_SQL = """
 CREATE TABLE IF NOT EXISTS external_api_keys (
     id SERIAL PRIMARY KEY,
     name VARCHAR(128) NOT NULL,
-    api_key VARCHAR(128) NOT NULL UNIQUE,
+    api_key BYTEA NOT NULL UNIQUE,
     instance_type VARCHAR(64) NOT NULL DEFAULT 'external',
-    scopes JSONB NOT NULL DEFAULT '[]'::jsonb,
+    scopes INTEGER NOT NULL DEFAULT 0,
     rate_limit INTEGER NOT NULL DEFAULT 120,
     is_active BOOLEAN NOT NULL DEFAULT true,
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
@@ -93,7 +107,7 @@ CREATE TABLE IF NOT EXISTS federated_instances (
     id SERIAL PRIMARY KEY,
     name VARCHAR(128) NOT NULL,
     endpoint VARCHAR(512) NOT NULL,
-    api_key_hash VARCHAR(128),
+    api_key_hash BYTEA,
     status VARCHAR(32) NOT NULL DEFAULT 'pending',
     capabilities JSONB NOT NULL DEFAULT '[]'::jsonb,
     sync_direction VARCHAR(32) NOT NULL DEFAULT 'bidirectional',
@@ -101,127 +115,268 @@ CREATE TABLE IF NOT EXISTS federated_instances (
     created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Older deployments stored keys in plaintext and fingerprints as hex text;
+-- both become raw 32-byte SHA-256 digests. JSONB scope lists become the
+-- SCOPES bitmask (bit order must match the Python mapping).
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'external_api_keys' AND column_name = 'api_key') <> 'bytea' THEN
+        ALTER TABLE external_api_keys
+            ALTER COLUMN api_key TYPE BYTEA USING sha256(convert_to(api_key, 'UTF8'));
+    END IF;
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'federated_instances' AND column_name = 'api_key_hash') <> 'bytea' THEN
+        ALTER TABLE federated_instances
+            ALTER COLUMN api_key_hash TYPE BYTEA USING decode(api_key_hash, 'hex');
+    END IF;
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'external_api_keys' AND column_name = 'scopes') = 'jsonb' THEN
+        ALTER TABLE external_api_keys ADD COLUMN scopes_mask INTEGER NOT NULL DEFAULT 0;
+        UPDATE external_api_keys SET scopes_mask =
+              (scopes @> '["read"]')::int
+            | ((scopes @> '["write"]')::int << 1)
+            | ((scopes @> '["admin"]')::int << 2)
+            | ((scopes @> '["search"]')::int << 3)
+            | ((scopes @> '["hybrid"]')::int << 4)
+            | ((scopes @> '["sync"]')::int << 5)
+            | ((scopes @> '["crawl"]')::int << 6)
+            | ((scopes @> '["basin"]')::int << 7);
+        ALTER TABLE external_api_keys DROP COLUMN scopes;
+        ALTER TABLE external_api_keys RENAME COLUMN scopes_mask TO scopes;
+    END IF;
+END $$;
+
 CREATE INDEX IF NOT EXISTS idx_api_keys_key ON external_api_keys(api_key);
+-- Lets per-request key validation run as an index-only scan
+CREATE INDEX IF NOT EXISTS idx_api_keys_key_covering
+    ON external_api_keys(api_key) INCLUDE (is_active, rate_limit, scopes);
 CREATE INDEX IF NOT EXISTS idx_federated_instances_status ON federated_instances(status);
 """
 
 
+_tables_ready = False
+
+
 def ensure_tables(session: Session):
-    """Ensure federation tables exist."""
+    """Ensure federation tables exist (once per process, from app startup)."""
+    global _tables_ready
+    if _tables_ready:
+        return
     try:
         session.execute(text(SETUP_SQL))
         session.commit()
+        _tables_ready = True
     except Exception as e:
         _log.warning("Could not create federation tables: %s", e)
         session.rollback()
 
 
+# === Statements ===
+
+# Module-level TextClauses with typed binds, reused across requests.
+
+LIST_KEYS_SQL = text(
+    """
+    SELECT id, name, instance_type, scopes, created_at, last_used_at, rate_limit, is_active
+    FROM external_api_keys
+    ORDER BY created_at DESC
+"""
+)
+
+INSERT_KEY_SQL = text(
+    """
+    INSERT INTO external_api_keys (name, api_key, instance_type, scopes, rate_limit, is_active, created_at)
+    VALUES (:name, :api_key, :instance_type, :scopes, :rate_limit, true, NOW())
+    RETURNING id
+"""
+).bindparams(
+    bindparam("name", type_=String),
+    bindparam("api_key", type_=LargeBinary),
+    bindparam("instance_type", type_=String),
+    bindparam("scopes", type_=Integer),
+    bindparam("rate_limit", type_=Integer),
+)
+
+REVOKE_KEY_SQL = text(
+    "UPDATE external_api_keys SET is_active = false WHERE id = :key_id"
+).bindparams(bindparam("key_id", type_=Integer))
+
+LIST_INSTANCES_SQL = text(
+    """
+    SELECT id, name, endpoint, status, capabilities, sync_direction, last_sync_at, created_at
+    FROM federated_instances
+    ORDER BY last_sync_at DESC NULLS LAST
+"""
+)
+
+INSERT_INSTANCE_SQL = text(
+    """
+    INSERT INTO federated_instances (name, endpoint, api_key_hash, capabilities, status, created_at)
+    VALUES (:name, :endpoint, :key_hash, CAST(:capabilities AS jsonb), 'pending', NOW())
+    RETURNING id
+"""
+).bindparams(
+    bindparam("name", type_=String),
+    bindparam("endpoint", type_=String),
+    bindparam("key_hash", type_=LargeBinary),
+    bindparam("capabilities", type_=String),
+)
+
+# Same insert without RETURNING, for executemany batches
+INSERT_INSTANCES_SQL = text(
+    """
+    INSERT INTO federated_instances (name, endpoint, api_key_hash, capabilities, status, created_at)
+    VALUES (:name, :endpoint, :key_hash, CAST(:capabilities AS jsonb), 'pending', NOW())
+"""
+).bindparams(
+    bindparam("name", type_=String),
+    bindparam("endpoint", type_=String),
+    bindparam("key_hash", type_=LargeBinary),
+    bindparam("capabilities", type_=String),
+)
+
+SYNC_STATUS_SQL = text(
+    """
+    SELECT COUNT(*) as count, MAX(last_sync_at) as latest_sync
+    FROM federated_instances
+    WHERE status = 'active'
+"""
+)
+
+
+# === Scopes ===
+
+# Scopes are stored as an INTEGER bitmask; never reorder, only append.
+SCOPES = {
+    "read": 1 << 0,
+    "write": 1 << 1,
+    "admin": 1 << 2,
+    "search": 1 << 3,
+    "hybrid": 1 << 4,
+    "sync": 1 << 5,
+    "crawl": 1 << 6,
+    "basin": 1 << 7,
+}
+
+# Decoded scope list for every possible mask, so listing is a table lookup
+SCOPE_NAMES = [
+    [name for name, bit in SCOPES.items() if mask & bit]
+    for mask in range(1 << len(SCOPES))
+]
+
+
+def scope_mask(names: list[str]) -> int:
+    mask = 0
+    for name in names:
+        mask |= SCOPES[name]
+    return mask
+
+
+# === Key fingerprints ===
+
+
+def _fingerprint_many(keys: list[str]) -> list[bytes]:
+    """Raw 32-byte SHA-256 fingerprints for a batch of API keys.
+
+    One comprehension over the bound OpenSSL constructor keeps the per-key
+    overhead to the C hash call itself (SHA-NI where the CPU has it).
+    """
+    sha256 = hashlib.sha256
+    return [sha256(key.encode()).digest() for key in keys]
+
+
+# === Response caches ===
+
+# Health checks arrive from load balancers at a high rate and peer counts move
+# slowly, so both are served from short-lived caches. The routes touching them
+# are async, so the caches are only ever used from the event loop.
+_health_cache: TTLCache = TTLCache(maxsize=1, ttl=1.0)
+_sync_status_cache: TTLCache = TTLCache(maxsize=1, ttl=5.0)
+
+
+def _health_response() -> Response:
+    body = _health_cache.get("health")
+    if body is None:
+        body = orjson.dumps(
+            {
+                "status": "healthy",
+                "version": "0.2.0",
+                "timestamp": datetime.utcnow().isoformat(),
+                "capabilities": ["search", "hybrid", "crawl", "sync", "basin_geometry"],
+            }
+        )
+        _health_cache["health"] = body
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": "max-age=1"},
+    )
+
+
 # === Routes ===
 
 
 @router.get("/health", response_model=HealthResponse)
-def federation_health():
+async def federation_health():
     """Public health endpoint for connectivity checks."""
-    return HealthResponse(
-        status="healthy",
-        version="0.2.0",
-        timestamp=datetime.utcnow().isoformat(),
-        capabilities=["search", "hybrid", "crawl", "sync", "basin_geometry"],
-    )
+    return _health_response()
 
 
 @router.get("/keys")
-def list_api_keys():
+async def list_api_keys(session: AsyncSession = Depends(get_async_db)):
     """List all API keys for the dashboard."""
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        result = session.execute(
-            text(
-                """
-            SELECT id, name, instance_type, scopes, created_at, last_used_at, rate_limit, is_active
-            FROM external_api_keys
-            ORDER BY created_at DESC
-        """
+    result = await session.execute(LIST_KEYS_SQL)
+
+    # Rows come typed from the DB, so skip pydantic validation per row.
+    keys = []
+    for row in result.mappings():
+        keys.append(
+            ApiKeyResponse.model_construct(
+                id=row["id"],
+                name=row["name"],
+                instance_type=row["instance_type"],
+                scopes=SCOPE_NAMES[row["scopes"]],
+                created_at=row["created_at"],
+                last_used_at=row["last_used_at"],
+                rate_limit=row["rate_limit"] or 120,
+                is_active=(row["is_active"] if row["is_active"] is not None else True),
             )
         )
 
-        keys = []
-        for row in result.mappings():
-            scopes = row["scopes"]
-            if isinstance(scopes, str):
-                import json
-
-                scopes = json.loads(scopes)
-            keys.append(
-                ApiKeyResponse(
-                    id=row["id"],
-                    name=row["name"],
-                    instance_type=row["instance_type"],
-                    scopes=scopes if isinstance(scopes, list) else [],
-                    created_at=row["created_at"],
-                    last_used_at=row["last_used_at"],
-                    rate_limit=row["rate_limit"] or 120,
-                    is_active=(
-                        row["is_active"] if row["is_active"] is not None else True
-                    ),
-                )
-            )
-
-        return {"keys": keys}
+    return {"keys": keys}
 
 
 @router.post("/keys")
-def create_api_key(req: CreateKeyRequest):
+async def create_api_key(
+    req: CreateKeyRequest, session: AsyncSession = Depends(get_autocommit_db)
+):
     """Create a new unified API key (all scopes)."""
     valid_types = ["external", "headless", "federation", "research", "development"]
     if req.instance_type not in valid_types:
         raise HTTPException(400, f"Invalid instance_type. Valid: {valid_types}")
 
-    valid_scopes = [
-        "read",
-        "write",
-        "admin",
-        "search",
-        "hybrid",
-        "sync",
-        "crawl",
-        "basin",
-    ]
     for scope in req.scopes:
-        if scope not in valid_scopes:
-            raise HTTPException(400, f"Invalid scope '{scope}'. Valid: {valid_scopes}")
-
-    raw_key = f"qig_{secrets.token_hex(32)}"
-
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        import json
-
-        scopes_json = json.dumps(req.scopes)
-
-        result = session.execute(
-            text(
-                """
-            INSERT INTO external_api_keys (name, api_key, instance_type, scopes, rate_limit, is_active, created_at)
-            VALUES (:name, :api_key, :instance_type, :scopes::jsonb, :rate_limit, true, NOW())
-            RETURNING id
-        """
-            ),
-            {
-                "name": req.name,
-                "api_key": raw_key,
-                "instance_type": req.instance_type,
-                "scopes": scopes_json,
-                "rate_limit": req.rate_limit,
-            },
-        )
+        if scope not in SCOPES:
+            raise HTTPException(400, f"Invalid scope '{scope}'. Valid: {list(SCOPES)}")
+
+    raw_key = f"qig_{token_hex(32)}"
+    # Only the digest is stored; the raw key is shown once below
+    (key_hash,) = _fingerprint_many([raw_key])
+
+    result = await session.execute(
+        INSERT_KEY_SQL,
+        {
+            "name": req.name,
+            "api_key": key_hash,
+            "instance_type": req.instance_type,
+            "scopes": scope_mask(req.scopes),
+            "rate_limit": req.rate_limit,
+        },
+    )
 
-        row = result.fetchone()
-        inserted_id = row[0] if row else None
+    row = result.fetchone()
+    inserted_id = row[0] if row else None
 
     return {
         "message": "API key created",
@@ -232,131 +387,117 @@ def create_api_key(req: CreateKeyRequest):
 
 
 @router.delete("/keys/{key_id}")
-def revoke_api_key(key_id: int):
+async def revoke_api_key(
+    key_id: int, session: AsyncSession = Depends(get_autocommit_db)
+):
     """Revoke an API key."""
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        session.execute(
-            text(
-                """
-            UPDATE external_api_keys SET is_active = false WHERE id = :key_id
-        """
-            ),
-            {"key_id": key_id},
-        )
+    await session.execute(
+        REVOKE_KEY_SQL,
+        {"key_id": key_id},
+    )
 
     return {"message": "API key revoked", "key_id": key_id}
 
 
 @router.get("/instances")
-def list_instances():
+async def list_instances(session: AsyncSession = Depends(get_async_db)):
     """List all connected federated instances."""
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        result = session.execute(
-            text(
-                """
-            SELECT id, name, endpoint, status, capabilities, sync_direction, last_sync_at, created_at
-            FROM federated_instances
-            ORDER BY last_sync_at DESC NULLS LAST
-        """
+    result = await session.execute(LIST_INSTANCES_SQL)
+
+    # Rows come typed from the DB, so skip pydantic validation per row.
+    instances = []
+    for row in result.mappings():
+        instances.append(
+            FederatedInstanceResponse.model_construct(
+                id=row["id"],
+                name=row["name"],
+                endpoint=row["endpoint"],
+                status=row["status"] or "pending",
+                capabilities=row["capabilities"],
+                sync_direction=row["sync_direction"] or "bidirectional",
+                last_sync_at=row["last_sync_at"],
+                created_at=row["created_at"],
             )
         )
 
-        instances = []
-        for row in result.mappings():
-            caps = row["capabilities"]
-            if isinstance(caps, str):
-                import json
-
-                caps = json.loads(caps)
-            instances.append(
-                FederatedInstanceResponse(
-                    id=row["id"],
-                    name=row["name"],
-                    endpoint=row["endpoint"],
-                    status=row["status"] or "pending",
-                    capabilities=caps if isinstance(caps, list) else [],
-                    sync_direction=row["sync_direction"] or "bidirectional",
-                    last_sync_at=row["last_sync_at"],
-                    created_at=row["created_at"],
-                )
-            )
-
-        return {"instances": instances}
+    return {"instances": instances}
 
 
 @router.post("/instances/register")
-def register_instance(
-    name: str, endpoint: str, api_key: str, capabilities: list[str] = None
+async def register_instance(
+    name: str,
+    endpoint: str,
+    api_key: str,
+    capabilities: list[str] = None,
+    session: AsyncSession = Depends(get_autocommit_db),
 ):
     """Register a new federated instance."""
-    import hashlib
-
-    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        import json
-
-        caps_json = json.dumps(capabilities or [])
-
-        result = session.execute(
-            text(
-                """
-            INSERT INTO federated_instances (name, endpoint, api_key_hash, capabilities, status, created_at)
-            VALUES (:name, :endpoint, :key_hash, :capabilities::jsonb, 'pending', NOW())
-            RETURNING id
-        """
-            ),
-            {
-                "name": name,
-                "endpoint": endpoint,
-                "key_hash": key_hash,
-                "capabilities": caps_json,
-            },
-        )
+    (key_hash,) = _fingerprint_many([api_key])
+
+    caps_json = orjson.dumps(capabilities or []).decode()
+
+    result = await session.execute(
+        INSERT_INSTANCE_SQL,
+        {
+            "name": name,
+            "endpoint": endpoint,
+            "key_hash": key_hash,
+            "capabilities": caps_json,
+        },
+    )
 
-        row = result.fetchone()
-        instance_id = row[0] if row else None
+    row = result.fetchone()
+    instance_id = row[0] if row else None
 
     return {"message": "Instance registered", "id": instance_id}
 
 
+@router.post("/instances/register_batch")
+async def register_instances(
+    req: RegisterInstanceBatchRequest,
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Register several federated instances in one round-trip."""
+    if req.items:
+        key_hashes = _fingerprint_many([item.api_key for item in req.items])
+        await session.execute(
+            INSERT_INSTANCES_SQL,
+            [
+                {
+                    "name": item.name,
+                    "endpoint": item.endpoint,
+                    "key_hash": key_hash,
+                    "capabilities": orjson.dumps(item.capabilities).decode(),
+                }
+                for item, key_hash in zip(req.items, key_hashes, strict=True)
+            ],
+        )
+
+    return {"message": "Instances registered", "count": len(req.items)}
+
+
 @router.get("/sync/status", response_model=SyncStatusResponse)
-def get_sync_status():
+async def get_sync_status(session: AsyncSession = Depends(get_async_db)):
     """Get current basin sync status."""
-    cfg = get_config()
-    store = DocumentStore(cfg.db_url)
-    with store.session() as session:
-        ensure_tables(session)
-        result = session.execute(
-            text(
-                """
-            SELECT COUNT(*) as count, MAX(last_sync_at) as latest_sync
-            FROM federated_instances
-            WHERE status = 'active'
-        """
-            )
-        )
+    status = _sync_status_cache.get("status")
+    if status is not None:
+        return status
+
+    result = await session.execute(SYNC_STATUS_SQL)
 
-        row = result.mappings().fetchone()
-        peer_count = int(row["count"] or 0) if row else 0
-        latest_sync = row["latest_sync"] if row else None
+    row = result.mappings().fetchone()
+    peer_count = int(row["count"] or 0) if row else 0
+    latest_sync = row["latest_sync"] if row else None
 
-    return SyncStatusResponse(
+    status = SyncStatusResponse(
         is_connected=peer_count > 0,
         peer_count=peer_count,
         last_sync_time=latest_sync.isoformat() if latest_sync else None,
         pending_packets=0,
         sync_mode="bidirectional" if peer_count > 0 else "standalone",
     )
+    _sync_status_cache["status"] = status
+    return status
 
 
 # === External API Routes (for other QIG systems) ===
@@ -365,20 +506,15 @@ external_router = APIRouter(prefix="/api/v1/external", tags=["external"])
 
 
 @external_router.get("/health")
-def external_health():
+async def external_health():
     """Public health endpoint for external connectivity checks."""
-    return {
-        "status": "healthy",
-        "version": "0.2.0",
-        "timestamp": datetime.utcnow().isoformat(),
-        "capabilities": ["search", "hybrid", "crawl", "sync", "basin_geometry"],
-    }
+    return _health_response()
 
 
 @external_router.get("/sync/status")
-def external_sync_status():
+async def external_sync_status(session: AsyncSession = Depends(get_async_db)):
     """Get sync status for external systems."""
-    return get_sync_status()
+    return await get_sync_status(session)
 
 
 @external_router.post("/basin/query")
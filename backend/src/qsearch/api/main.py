@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import logging
 from contextlib import asynccontextmanager
 from typing import Optional
@@ -11,10 +10,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from starlette.middleware.sessions import SessionMiddleware
 
-from qsearch.api.deps import get_cache, get_config, get_orchestrator
-from qsearch.api.auth import router as auth_router
-from qsearch.api.routes_v1 import router as v1_router
-from qsearch.api.federation import router as federation_router, external_router
+from qsearch.api.deps import get_cache, get_config, get_search_batcher, get_store
+from qsearch.cache import log_hash
+from qsearch.api.auth import ensure_users_table, router as auth_router
+from qsearch.api.routes_v1 import health_v1, router as v1_router, search_v1
+from qsearch.api.responses import ORJSONResponse
+from qsearch.api.tokens import init_signing_key
+from qsearch.api.federation import (
+    ensure_tables,
+    external_router,
+    router as federation_router,
+)
 from qsearch.search.hybrid import HybridSearchOrchestrator
 from qsearch.search.learner import get_learner
 
@@ -32,24 +38,42 @@ def get_hybrid_orchestrator() -> HybridSearchOrchestrator:
             serper_api_key=cfg.serper_api_key,
             fetch_content=True,
             max_fetch=15,
+            cache=get_cache(),
         )
     return _hybrid_orchestrator
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: start continuous learner
     cfg = get_config()
+    # Fail fast on a multi-worker deployment without a shared signing secret
+    init_signing_key()
+
+    # Startup: create auth/federation tables once instead of per request
+    with get_store(cfg.db_url).session() as session:
+        ensure_users_table(session)
+        ensure_tables(session)
+
+    # Startup: start continuous learner
     learner = get_learner(db_url=cfg.db_url)
     await learner.start()
     _log.info("Continuous learner started")
     yield
     # Shutdown
+    await get_search_batcher().stop()
+    await get_cache().aclose()
     await learner.stop()
+    if _hybrid_orchestrator is not None:
+        await _hybrid_orchestrator.aclose()
     _log.info("Continuous learner stopped")
 
 
-app = FastAPI(title="qsearch", version="0.2.0", lifespan=lifespan)
+app = FastAPI(
+    title="qsearch",
+    version="0.2.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 _cfg = get_config()
 if _cfg.session_secret:
@@ -77,68 +101,10 @@ app.include_router(federation_router)
 app.include_router(external_router)
 
 
-class SearchRequest(BaseModel):
-    query: str
-    limit: int = 10
-
-
-@app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
-
-
-@app.post("/search")
-def search(req: SearchRequest):
-    qh = hashlib.sha256(req.query.encode()).hexdigest()[:12]
-    orchestrator = get_orchestrator()
-    cache = get_cache()
-    cached = cache.get(req.query, req.limit)
-    if cached is not None:
-        _log.info(
-            "search cache_hit=1 cache_enabled=%s qh=%s limit=%s count=%s",
-            cache.enabled,
-            qh,
-            req.limit,
-            cached.get("count"),
-        )
-        cached["cache_hit"] = True
-        return cached
-
-    results = orchestrator.search(req.query, limit=req.limit)
-    payload = {
-        "query": req.query,
-        "count": len(results),
-        "cache_hit": False,
-        "results": [
-            {
-                "doc_id": r.doc_id,
-                "url": r.url,
-                "title": r.title,
-                "snippet": r.snippet,
-                "distance": r.distance,
-            }
-            for r in results
-        ],
-    }
-    _log.info(
-        "search cache_hit=0 cache_enabled=%s qh=%s limit=%s count=%s",
-        cache.enabled,
-        qh,
-        req.limit,
-        payload.get("count"),
-    )
-    cache.set(req.query, req.limit, payload)
-    return payload
-
-
-@app.get("/api/health")
-def health_alias() -> dict[str, str]:
-    return {"status": "ok"}
-
-
-@app.post("/api/search")
-def search_alias(req: SearchRequest):
-    return search(req)
+# /health and /search are served by the v1 router mounted at the root above;
+# the /api aliases reuse the same handlers rather than wrapping them.
+app.add_api_route("/api/health", health_v1, methods=["GET"])
+app.add_api_route("/api/search", search_v1, methods=["POST"])
 
 
 # === Hybrid Search Endpoints ===
@@ -156,10 +122,15 @@ async def hybrid_search(req: HybridSearchRequest, background_tasks: BackgroundTa
     """
     Hybrid search combining Serper web results with basin geometry re-ranking.
     """
-    qh = hashlib.sha256(req.query.encode()).hexdigest()[:12]
+    qh = log_hash(req.query)
     orchestrator = get_hybrid_orchestrator()
 
-    results = await orchestrator.search(req.query, limit=req.limit, alpha=req.alpha)
+    results = await orchestrator.search(
+        req.query,
+        limit=req.limit,
+        alpha=req.alpha,
+        defer=background_tasks.add_task,
+    )
 
     # Queue URLs for background learning
     if req.learn and results:
@@ -170,23 +141,26 @@ async def hybrid_search(req: HybridSearchRequest, background_tasks: BackgroundTa
             "hybrid qh=%s count=%s queued_for_learning=%s", qh, len(results), queued
         )
 
-    return {
-        "query": req.query,
-        "count": len(results),
-        "mode": "hybrid",
-        "alpha": req.alpha,
-        "results": [
-            {
-                "url": r.url,
-                "title": r.title,
-                "snippet": r.snippet,
-                "serper_position": r.serper_position,
-                "basin_distance": r.basin_distance,
-                "hybrid_score": r.hybrid_score,
-            }
-            for r in results
-        ],
-    }
+    # Returned as a Response so FastAPI skips its jsonable_encoder pass
+    return ORJSONResponse(
+        {
+            "query": req.query,
+            "count": len(results),
+            "mode": "hybrid",
+            "alpha": req.alpha,
+            "results": [
+                {
+                    "url": r.url,
+                    "title": r.title,
+                    "snippet": r.snippet,
+                    "serper_position": r.serper_position,
+                    "basin_distance": r.basin_distance,
+                    "hybrid_score": r.hybrid_score,
+                }
+                for r in results
+            ],
+        }
+    )
 
 
 @app.post("/api/hybrid")
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (numpy arrays included).
+
+    Defined here rather than imported from FastAPI, whose own ORJSONResponse
+    is deprecated in newer releases.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import hashlib
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from pydantic import BaseModel
 
-from qsearch.cache import SearchCache
-from qsearch.api.deps import get_cache, get_orchestrator
-from qsearch.search.orchestrator import SearchOrchestrator
+from qsearch.api.batcher import SearchBatcher
+from qsearch.cache import SearchCache, query_hash
+from qsearch.api.deps import get_cache, get_search_batcher
+from qsearch.api.responses import ORJSONResponse
+from qsearch.search.orchestrator import SearchResult
 
 router = APIRouter()
 _log = logging.getLogger("qsearch.api")
@@ -20,24 +21,14 @@ class SearchRequest(BaseModel):
     limit: int = 10
 
 
-def _search_payload(
-    orchestrator: SearchOrchestrator, query: str, limit: int
-) -> dict[str, Any]:
-    results = orchestrator.search(query, limit=limit)
+def _search_payload(query: str, results: list[SearchResult]) -> dict[str, Any]:
+    # SearchResult's fields are exactly the response's result keys, so orjson
+    # serializes the dataclasses as-is instead of via per-result dicts.
     return {
         "query": query,
         "count": len(results),
         "cache_hit": False,
-        "results": [
-            {
-                "doc_id": r.doc_id,
-                "url": r.url,
-                "title": r.title,
-                "snippet": r.snippet,
-                "distance": r.distance,
-            }
-            for r in results
-        ],
+        "results": results,
     }
 
 
@@ -47,14 +38,17 @@ def health_v1() -> dict[str, str]:
 
 
 @router.post("/search")
-def search_v1(
+async def search_v1(
     req: SearchRequest,
-    orchestrator: SearchOrchestrator = Depends(get_orchestrator),
+    background_tasks: BackgroundTasks,
+    batcher: SearchBatcher = Depends(get_search_batcher),
     cache: SearchCache = Depends(get_cache),
 ):
-    qh = hashlib.sha256(req.query.encode()).hexdigest()[:12]
+    # One digest serves as both the Redis key and the log fingerprint
+    qhash = query_hash(req.query, req.limit)
+    qh = qhash[:12]
 
-    cached = cache.get(req.query, req.limit)
+    cached = await cache.get(req.query, req.limit, qhash=qhash)
     if cached is not None:
         _log.info(
             "search cache_hit=1 cache_enabled=%s qh=%s limit=%s count=%s",
@@ -63,10 +57,11 @@ def search_v1(
             req.limit,
             cached.get("count"),
         )
-        cached["cache_hit"] = True
-        return cached
+        # Cached payloads are shared; never mutate them in place
+        return ORJSONResponse({**cached, "cache_hit": True})
 
-    payload = _search_payload(orchestrator, req.query, req.limit)
+    results = await batcher.search(req.query, req.limit)
+    payload = _search_payload(req.query, results)
     _log.info(
         "search cache_hit=0 cache_enabled=%s qh=%s limit=%s count=%s",
         cache.enabled,
@@ -74,5 +69,6 @@ def search_v1(
         req.limit,
         payload.get("count"),
     )
-    cache.set(req.query, req.limit, payload)
-    return payload
+    # Written after the response is sent, keeping the Redis RTT off the miss path
+    background_tasks.add_task(cache.set, req.query, req.limit, payload, qhash=qhash)
+    return ORJSONResponse(payload)
@@ -0,0 +1,181 @@
+"""
+Short-lived access tokens for authenticated routes.
+
+A token is an Ed25519-signed JSON payload carrying the user's profile, so
+verifying one is a signature check rather than a users lookup. Logout revokes
+tokens through a small in-process Bloom filter that only has to remember them
+for as long as they could still be valid, and, when REDIS_URL is set, through
+a Redis key expiring with the token, so every worker sees the revocation.
+
+Every worker must sign with the same key: with more than one worker
+(WEB_CONCURRENCY > 1) QSEARCH_SESSION_SECRET is required.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+from functools import lru_cache
+from typing import Any
+
+import orjson
+import redis.asyncio as aioredis
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey, VerifyKey
+
+from qsearch.api.deps import get_config
+from qsearch.api.entropy import rand_bytes
+from qsearch.bloom import BloomFilter
+
+_log = logging.getLogger("qsearch.tokens")
+
+ACCESS_TOKEN_TTL = 15 * 60
+
+_SIG_BYTES = 64
+
+
+@lru_cache(maxsize=1)
+def _signing_key() -> SigningKey:
+    # Derived from the session secret so every worker signs with the same key;
+    # without one, tokens are only valid within this process.
+    cfg = get_config()
+    secret = cfg.session_secret
+    if not secret:
+        if cfg.workers > 1:
+            raise RuntimeError(
+                "QSEARCH_SESSION_SECRET must be set when running more than one "
+                "worker; otherwise each worker signs tokens with its own key"
+            )
+        return SigningKey(rand_bytes(32))
+    seed = hashlib.blake2b(
+        secret.encode(), digest_size=32, person=b"qsearch-token"
+    ).digest()
+    return SigningKey(seed)
+
+
+@lru_cache(maxsize=1)
+def _verify_key() -> VerifyKey:
+    return _signing_key().verify_key
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(token: str) -> bytes:
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
+
+# === Revocation ===
+
+# Two generations, rotated every TTL: a token revoked more than one full
+# generation ago has expired anyway, so the filters never need to grow.
+_revoked_current = BloomFilter(capacity=100_000)
+_revoked_previous = BloomFilter(capacity=100_000)
+_rotated_at = time.monotonic()
+
+
+def _rotate_revocations() -> None:
+    global _revoked_current, _revoked_previous, _rotated_at
+    now = time.monotonic()
+    if now - _rotated_at < ACCESS_TOKEN_TTL:
+        return
+    _revoked_previous.clear()
+    _revoked_current, _revoked_previous = _revoked_previous, _revoked_current
+    _rotated_at = now
+
+
+def _is_revoked(signature: bytes) -> bool:
+    _rotate_revocations()
+    return signature in _revoked_current or signature in _revoked_previous
+
+
+# Shared revocations: one key per revoked token, expiring with the token.
+# Redis clients are bound to the event loop that first used them.
+_redis: tuple[asyncio.AbstractEventLoop, aioredis.Redis] | None = None
+
+
+def _shared_revocations() -> aioredis.Redis | None:
+    global _redis
+    url = get_config().redis_url
+    if not url:
+        return None
+    loop = asyncio.get_running_loop()
+    if _redis is None or _redis[0] is not loop:
+        _redis = (loop, aioredis.Redis.from_url(url))
+    return _redis[1]
+
+
+def _revocation_key(signature: bytes) -> str:
+    return "qsearch:revoked:" + hashlib.blake2b(signature, digest_size=16).hexdigest()
+
+
+# === Public API ===
+
+
+def init_signing_key() -> None:
+    """Derive the signing key now, so a missing session secret fails at startup."""
+    _signing_key()
+
+
+def issue_token(uid: int, user: dict[str, Any]) -> str:
+    """Sign an access token for users.id `uid` embedding its public profile."""
+    claims = {"uid": uid, "user": user, "exp": int(time.time()) + ACCESS_TOKEN_TTL}
+    return _b64encode(bytes(_signing_key().sign(orjson.dumps(claims))))
+
+
+def _verified_claims(token: str) -> tuple[bytes, dict[str, Any]] | None:
+    """(signature, claims) of a well-signed, unexpired token."""
+    try:
+        raw = _b64decode(token)
+    except ValueError:
+        return None
+    if len(raw) <= _SIG_BYTES:
+        return None
+    try:
+        claims = orjson.loads(_verify_key().verify(raw))
+    except (BadSignatureError, orjson.JSONDecodeError):
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return raw[:_SIG_BYTES], claims
+
+
+async def verify_token(token: str) -> dict[str, Any] | None:
+    """Return the token's claims, or None if forged, expired or revoked."""
+    verified = _verified_claims(token)
+    if verified is None:
+        return None
+    signature, claims = verified
+    if _is_revoked(signature):
+        return None
+    client = _shared_revocations()
+    if client is not None:
+        try:
+            if await client.exists(_revocation_key(signature)):
+                return None
+        except Exception as e:
+            # Like the search cache, degrade rather than fail every request
+            _log.warning("Could not check shared token revocations: %s", e)
+    return claims
+
+
+async def revoke_token(token: str | None) -> None:
+    """Revoke a token in this process and, with Redis, in every worker."""
+    verified = _verified_claims(token) if token else None
+    if verified is None:
+        return
+    signature, claims = verified
+    _rotate_revocations()
+    _revoked_current.add(signature)
+    client = _shared_revocations()
+    if client is None:
+        return
+    ttl = max(1, int(claims["exp"] - time.time()) + 1)
+    try:
+        await client.set(_revocation_key(signature), b"1", ex=ttl)
+    except Exception as e:
+        _log.warning("Could not share token revocation: %s", e)
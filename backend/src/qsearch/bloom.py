@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import math
+
+import numpy as np
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over a numpy bit array.
+
+    Membership may return false positives (at roughly `error_rate` once
+    `capacity` keys have been added) but never false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(1, int(capacity))
+        self._m = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._k = max(1, round(self._m / capacity * math.log(2)))
+        self._bits = np.zeros((self._m + 7) // 8, dtype=np.uint8)
+        self._count = 0
+
+    def _positions(self, key: str | bytes) -> list[int]:
+        if isinstance(key, str):
+            key = key.encode()
+        # Double hashing: k probes derived from one 128-bit digest
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self._m for i in range(self._k)]
+
+    def add(self, key: str | bytes) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, key: str | bytes) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        """Number of add() calls (duplicates included)."""
+        return self._count
+
+    def clear(self) -> None:
+        self._bits.fill(0)
+        self._count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._bits.nbytes)
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows instead of degrading past its capacity.
+
+    Each time the newest stage fills, a stage with `growth` times the capacity
+    and `tightening` times the error rate is appended, so the compound false
+    positive rate stays below `error_rate / (1 - tightening)`.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1000,
+        error_rate: float = 0.001,
+        *,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ) -> None:
+        self._growth = growth
+        self._tightening = tightening
+        self._stages = [BloomFilter(initial_capacity, error_rate)]
+        self._capacity = max(1, int(initial_capacity))
+        self._error_rate = error_rate
+
+    def add(self, key: str | bytes) -> None:
+        stage = self._stages[-1]
+        if len(stage) >= self._capacity:
+            self._capacity *= self._growth
+            self._error_rate *= self._tightening
+            stage = BloomFilter(self._capacity, self._error_rate)
+            self._stages.append(stage)
+        stage.add(key)
+
+    def __contains__(self, key: str | bytes) -> bool:
+        return any(key in stage for stage in reversed(self._stages))
+
+    def __len__(self) -> int:
+        return sum(len(stage) for stage in self._stages)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(stage.nbytes for stage in self._stages)
@@ -1,42 +1,161 @@
 from __future__ import annotations
 
 import hashlib
-import json
 from typing import Any
 
-import redis
+import orjson
+import redis.asyncio as aioredis
+from cachetools import TTLCache
 
+# In-process tier in front of Redis: repeated queries within this window are
+# served without a network round-trip.
+MEMORY_TTL_SECONDS = 10.0
+MEMORY_MAXSIZE = 4096
 
-def _cache_key(query: str, limit: int) -> str:
-    h = hashlib.sha256(f"{query}\n{limit}".encode()).hexdigest()
-    return f"qsearch:search:{h}"
+
+def query_hash(query: str, limit: int) -> str:
+    """128-bit hash of a (query, limit) pair, for anything keyed on it."""
+    return hashlib.blake2b(
+        f"{query}\n{limit}".encode(), digest_size=16, person=b"qsearch-search"
+    ).hexdigest()
+
+
+def log_hash(query: str) -> str:
+    """12-char query fingerprint for log correlation only; never a key."""
+    return hashlib.blake2b(query.encode(), digest_size=6).hexdigest()
+
+
+def _cache_key(query: str, limit: int, qhash: str | None = None) -> str:
+    return f"qsearch:search:{qhash or query_hash(query, limit)}"
+
+
+def _page_key(url: str) -> str:
+    h = hashlib.blake2b(url.encode(), digest_size=16, person=b"qsearch-page")
+    return f"qsearch:page:{h.hexdigest()}"
+
+
+def _dumps(payload: dict[str, Any]) -> bytes:
+    # Still plain JSON on the wire, so entries written before the switch from
+    # stdlib json remain readable.
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
 
 
 class SearchCache:
-    def __init__(self, *, redis_url: str | None, ttl_seconds: int) -> None:
+    """Two-tier search cache: an in-process TTL map in front of Redis.
+
+    All methods are coroutines on a `redis.asyncio` client, so cache traffic
+    never blocks the event loop. Redis errors degrade to cache misses. The
+    in-process tier only fronts an enabled Redis tier, so disabling caching
+    (no Redis URL, or a TTL of 0) disables both; page encodings are only
+    cached in Redis.
+    """
+
+    def __init__(
+        self,
+        *,
+        redis_url: str | None,
+        ttl_seconds: int,
+        memory_ttl_seconds: float = MEMORY_TTL_SECONDS,
+    ) -> None:
         self._enabled = bool(redis_url)
         self._ttl = max(0, int(ttl_seconds))
-        self._client = redis.Redis.from_url(redis_url) if redis_url else None
+        self._client = aioredis.Redis.from_url(redis_url) if redis_url else None
+        # Only touched from the event loop. Payloads are shared with callers,
+        # who must treat them as read-only.
+        self._mem: TTLCache[tuple[str, int], dict[str, Any]] | None = (
+            TTLCache(maxsize=MEMORY_MAXSIZE, ttl=memory_ttl_seconds)
+            if memory_ttl_seconds > 0 and self.enabled
+            else None
+        )
 
     @property
     def enabled(self) -> bool:
+        """Whether the Redis tier is in use."""
         return self._enabled and self._client is not None and self._ttl > 0
 
-    def get(self, query: str, limit: int) -> dict[str, Any] | None:
-        if not self.enabled:
-            return None
+    def _mem_get(self, key: tuple[str, int]) -> dict[str, Any] | None:
+        return self._mem.get(key) if self._mem is not None else None
+
+    def _mem_set(self, key: tuple[str, int], payload: dict[str, Any]) -> None:
+        if self._mem is not None:
+            self._mem[key] = payload
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def get(
+        self, query: str, limit: int, *, qhash: str | None = None
+    ) -> dict[str, Any] | None:
+        """Cached payload for (query, limit).
+
+        `qhash` is `query_hash(query, limit)` if the caller already has it
+        (e.g. for logging), so the Redis key is not hashed a second time.
+        """
+        hit = self._mem_get((query, limit))
+        if hit is not None or not self.enabled:
+            return hit
         try:
-            raw = self._client.get(_cache_key(query, limit))
+            raw = await self._client.get(_cache_key(query, limit, qhash))
             if not raw:
                 return None
-            return json.loads(raw)
+            payload = orjson.loads(raw)
         except Exception:
             return None
+        self._mem_set((query, limit), payload)
+        return payload
 
-    def set(self, query: str, limit: int, payload: dict[str, Any]) -> None:
+    async def set(
+        self,
+        query: str,
+        limit: int,
+        payload: dict[str, Any],
+        *,
+        qhash: str | None = None,
+    ) -> None:
+        self._mem_set((query, limit), payload)
         if not self.enabled:
             return
         try:
-            self._client.setex(_cache_key(query, limit), self._ttl, json.dumps(payload))
+            await self._client.setex(
+                _cache_key(query, limit, qhash), self._ttl, _dumps(payload)
+            )
         except Exception:
             return
+
+    async def _get_many(self, keys: list[str]) -> list[dict[str, Any] | None]:
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+        try:
+            # One round-trip for the whole batch; no MULTI/EXEC needed for reads
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+            raws = await pipe.execute()
+        except Exception:
+            return [None] * len(keys)
+        out: list[dict[str, Any] | None] = []
+        for raw in raws:
+            try:
+                out.append(orjson.loads(raw) if raw else None)
+            except orjson.JSONDecodeError:
+                out.append(None)
+        return out
+
+    async def _set_many(self, items: list[tuple[str, dict[str, Any]]]) -> None:
+        if not self.enabled or not items:
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, payload in items:
+                pipe.setex(key, self._ttl, _dumps(payload))
+            await pipe.execute()
+        except Exception:
+            return
+
+    async def get_pages(self, urls: list[str]) -> list[dict[str, Any] | None]:
+        """Cached per-URL page encodings (see HybridSearchOrchestrator)."""
+        return await self._get_many([_page_key(url) for url in urls])
+
+    async def set_pages(self, pages: dict[str, dict[str, Any]]) -> None:
+        await self._set_many([(_page_key(url), page) for url, page in pages.items()])
@@ -21,6 +21,19 @@ def _parse_int(v: str | None, default: int) -> int:
         return default
 
 
+def _parse_float(v: str | None, default: float) -> float:
+    if not v:
+        return default
+    try:
+        return float(v)
+    except ValueError:
+        return default
+
+
+def _parse_bool(v: str | None) -> bool:
+    return (v or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _parse_csv(v: str | None) -> list[str]:
     if not v:
         return []
@@ -41,6 +54,14 @@ class QSearchConfig:
     microsoft_client_secret: str | None
     serper_api_key: str | None
     bing_api_key: str | None
+    search_batch_size: int = 32
+    search_batch_wait_ms: int = 10
+    index_int8: bool = False
+    cache_memory_ttl_seconds: float = 10.0
+    index_snapshot_dir: str | None = None
+    index_snapshot_seconds: float = 300.0
+    index_ann: bool = False
+    workers: int = 1
 
     @property
     def auth_enabled(self) -> bool:
@@ -83,6 +104,22 @@ class QSearchConfig:
         serper_api_key = os.environ.get("SERPER_API_KEY")
         bing_api_key = os.environ.get("BING_SEARCH_API")
 
+        search_batch_size = _parse_int(os.environ.get("QSEARCH_SEARCH_BATCH_SIZE"), 32)
+        search_batch_wait_ms = _parse_int(
+            os.environ.get("QSEARCH_SEARCH_BATCH_WAIT_MS"), 10
+        )
+        index_int8 = _parse_bool(os.environ.get("QSEARCH_INDEX_INT8"))
+        cache_memory_ttl_seconds = _parse_float(
+            os.environ.get("QSEARCH_CACHE_MEMORY_TTL_SECONDS"), 10.0
+        )
+        index_snapshot_dir = os.environ.get("QSEARCH_INDEX_SNAPSHOT_DIR") or None
+        index_snapshot_seconds = _parse_float(
+            os.environ.get("QSEARCH_INDEX_SNAPSHOT_SECONDS"), 300.0
+        )
+        index_ann = _parse_bool(os.environ.get("QSEARCH_INDEX_ANN"))
+        # gunicorn's own worker-count variable (see the Dockerfile)
+        workers = _parse_int(os.environ.get("WEB_CONCURRENCY"), 1)
+
         return QSearchConfig(
             db_url=db_url,
             redis_url=redis_url,
@@ -96,4 +133,12 @@ class QSearchConfig:
             microsoft_client_secret=microsoft_client_secret,
             serper_api_key=serper_api_key,
             bing_api_key=bing_api_key,
+            search_batch_size=max(1, search_batch_size),
+            search_batch_wait_ms=max(0, search_batch_wait_ms),
+            index_int8=index_int8,
+            cache_memory_ttl_seconds=max(0.0, cache_memory_ttl_seconds),
+            index_snapshot_dir=index_snapshot_dir,
+            index_snapshot_seconds=max(0.0, index_snapshot_seconds),
+            index_ann=index_ann,
+            workers=max(1, workers),
         )
@@ -1,18 +1,24 @@
 from .constants import BASIN_DIM, KAPPA_STAR
-from .encoding import encode_text_to_basin
+from .encoding import encode_query, encode_text_to_basin
 from .geometry import (
+    basin_to_sqrt_simplex,
     fisher_rao_distance,
+    fisher_rao_distance_fast,
     measure_kappa_from_basin,
     measure_phi_from_basin,
 )
-from .metrics import basin_distance
+from .metrics import basin_distance, basin_distances
 
 __all__ = [
     "BASIN_DIM",
     "KAPPA_STAR",
     "basin_distance",
+    "basin_distances",
+    "basin_to_sqrt_simplex",
+    "encode_query",
     "encode_text_to_basin",
     "fisher_rao_distance",
+    "fisher_rao_distance_fast",
     "measure_kappa_from_basin",
     "measure_phi_from_basin",
 ]
@@ -0,0 +1,31 @@
+"""Numba kernels for `qsearch.core.metrics` (optional; requires numba)."""
+
+from __future__ import annotations
+
+import math
+
+from numba import njit
+
+from ._geometry_numba import _FASTMATH
+
+
+@njit(cache=True, fastmath=_FASTMATH, boundscheck=False)
+def basin_distance_kernel(a, b):
+    """Fused `basin_distance`: both norms and the dot product in one pass."""
+    s = 0.0
+    na = 0.0
+    nb = 0.0
+    for i in range(a.shape[0]):
+        ai = a[i]
+        bi = b[i]
+        s += ai * bi
+        na += ai * ai
+        nb += bi * bi
+    if na == 0.0 or nb == 0.0:
+        return math.inf
+    c = s / math.sqrt(na * nb)
+    if c > 1.0:
+        c = 1.0
+    elif c < -1.0:
+        c = -1.0
+    return math.acos(c)
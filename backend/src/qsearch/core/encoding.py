@@ -1,19 +1,46 @@
 from __future__ import annotations
 
 import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
 from typing import Iterable
 
 import numpy as np
 
 from .constants import BASIN_DIM
 
+# Distinct query strings whose basins are memoized by `encode_query`
+QUERY_CACHE_SIZE = 10_000
+# Distinct tokens whose hashed (slot, sign) are memoized across documents
+TOKEN_CACHE_SIZE = 1 << 16
+
+# Runs of str.isalnum() characters
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
 
 def _tokenize(text: str) -> list[str]:
-    return [
-        t
-        for t in "".join(ch.lower() if ch.isalnum() else " " for ch in text).split()
-        if t
-    ]
+    # Tokens are lowercased per character: only "Σ" lowercases differently in
+    # context (final sigma), so map it up front.
+    return [t.lower() for t in _TOKEN_RE.findall(text.replace("Σ", "σ"))]
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_slot(tok: str, dim: int) -> tuple[int, bool]:
+    """Basin index and sign (True for -1) a token is hashed to."""
+    h = hashlib.blake2b(tok.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(h[:4], "little") % dim, bool(h[4] & 1)
+
+
+def _slot_weights(tokens: list[str], dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """Basin slots and signed counts of a text's distinct tokens."""
+    counts = Counter(tokens)
+    idx = np.empty(len(counts), dtype=np.intp)
+    weights = np.empty(len(counts), dtype=np.float64)
+    for j, (tok, count) in enumerate(counts.items()):
+        idx[j], negative = _token_slot(tok, dim)
+        weights[j] = -count if negative else count
+    return idx, weights
 
 
 def encode_text_to_basin(text: str, *, dim: int = BASIN_DIM) -> np.ndarray:
@@ -21,19 +48,55 @@ def encode_text_to_basin(text: str, *, dim: int = BASIN_DIM) -> np.ndarray:
     if not tokens:
         return np.zeros((dim,), dtype=np.float32)
 
-    vec = np.zeros((dim,), dtype=np.float32)
-    for tok in tokens:
-        h = hashlib.blake2b(tok.encode("utf-8"), digest_size=16).digest()
-        i = int.from_bytes(h[:4], "little") % dim
-        s = 1.0 if (h[4] & 1) == 0 else -1.0
-        vec[i] += s
+    idx, weights = _slot_weights(tokens, dim)
+    # Integer sums, so accumulating in float64 and casting is exact
+    vec = np.bincount(idx, weights=weights, minlength=dim).astype(np.float32)
 
     n = float(np.linalg.norm(vec))
     return (vec / n) if n > 0 else vec
 
 
 def batch_encode_texts(texts: Iterable[str], *, dim: int = BASIN_DIM) -> np.ndarray:
-    rows = [encode_text_to_basin(t, dim=dim) for t in texts]
+    """`encode_text_to_basin` for many texts, built as one (N, dim) matrix.
+
+    Every text's slots are offset into a single flat bincount, and all rows
+    are normalized in one pass.
+    """
+    idxs: list[np.ndarray] = []
+    weights: list[np.ndarray] = []
+    n = 0
+    for n, text in enumerate(texts, start=1):
+        idx, w = _slot_weights(_tokenize(text), dim)
+        idxs.append(idx + (n - 1) * dim)
+        weights.append(w)
+    if n == 0:
+        return np.zeros((0, dim), dtype=np.float32)
+
+    M = np.bincount(
+        np.concatenate(idxs), weights=np.concatenate(weights), minlength=n * dim
+    )
+    M = M.astype(np.float32).reshape(n, dim)
+    norms = np.linalg.norm(M, axis=1, keepdims=True)
+    np.divide(M, norms, out=M, where=norms > 0)
+    return M
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _encode_query_bytes(text: str, dim: int) -> bytes:
+    return encode_text_to_basin(text, dim=dim).tobytes()
+
+
+def encode_query(text: str, *, dim: int = BASIN_DIM) -> np.ndarray:
+    """`encode_text_to_basin` memoized per query string.
+
+    The result is a read-only view over the cached bytes; copy it before
+    modifying it in place.
+    """
+    return np.frombuffer(_encode_query_bytes(text, dim), dtype=np.float32)
+
+
+def batch_encode_queries(texts: Iterable[str], *, dim: int = BASIN_DIM) -> np.ndarray:
+    rows = [encode_query(t, dim=dim) for t in texts]
     if not rows:
         return np.zeros((0, dim), dtype=np.float32)
     return np.stack(rows, axis=0)
@@ -1,27 +1,59 @@
 from __future__ import annotations
 
 import math
+import threading
 
 import numpy as np
+from scipy.special import xlogy
 
 from .constants import KAPPA_STAR
 
+try:
+    from ._geometry_numba import fisher_rao_kernel as _fisher_rao_kernel
+except ImportError:  # numba is optional; fall back to the NumPy path
+    _fisher_rao_kernel = None
 
-def _basin_to_simplex(basin: np.ndarray, *, eps: float) -> np.ndarray:
-    x = np.asarray(basin, dtype=np.float32).reshape(-1)
+_tls = threading.local()
+
+
+def _scratch(n: int, slot: int) -> np.ndarray:
+    """Per-thread float32 work buffer, reused across calls of the same size.
+
+    Callers must not let the returned array escape: the next call on this
+    thread with the same (n, slot) overwrites it.
+    """
+    bufs = getattr(_tls, "bufs", None)
+    if bufs is None:
+        bufs = _tls.bufs = {}
+    buf = bufs.get((n, slot))
+    if buf is None:
+        buf = bufs[(n, slot)] = np.empty((n,), dtype=np.float32)
+    return buf
+
+
+def _basin_to_simplex(
+    basin: np.ndarray, *, eps: float, out: np.ndarray | None = None
+) -> np.ndarray:
+    # ravel() is a no-op view for the usual contiguous float32 basin.
+    x = np.asarray(basin, dtype=np.float32).ravel()
     if x.size == 0:
         return np.zeros((0,), dtype=np.float32)
+    if out is None:
+        out = np.empty((x.size,), dtype=np.float32)
 
     # Basin signatures can contain negative components; map to a probability simplex
-    # via squared magnitude.
-    p = np.square(x)
-    s = float(np.sum(p))
+    # via squared magnitude. The norm is a single BLAS dot, and the projection is
+    # written in place into `out` rather than through temporaries.
+    s = float(np.dot(x, x))
     if not math.isfinite(s) or s <= 0.0:
         # Avoid NaNs: fall back to a uniform distribution.
-        return np.full((x.size,), 1.0 / float(x.size), dtype=np.float32)
+        out.fill(np.float32(1.0 / float(x.size)))
+        return out
 
-    p = p / (s + eps)
-    return np.clip(p, eps, 1.0)
+    np.multiply(x, x, out=out)
+    out *= np.float32(1.0 / (s + eps))
+    np.clip(out, eps, 1.0, out=out)
+    return out
 
 
 def fisher_rao_distance(a: np.ndarray, b: np.ndarray, *, eps: float = 1e-8) -> float:
@@ -36,18 +68,52 @@ def fisher_rao_distance(a: np.ndarray, b: np.ndarray, *, eps: float = 1e-8) -> f
     vectors.
     """
 
-    p = _basin_to_simplex(a, eps=eps)
-    q = _basin_to_simplex(b, eps=eps)
-    if p.size == 0 or q.size == 0:
+    a = np.asarray(a, dtype=np.float32).ravel()
+    b = np.asarray(b, dtype=np.float32).ravel()
+    if a.size == 0 or b.size == 0:
         return float("inf")
-    if p.shape != q.shape:
+    if a.shape != b.shape:
         raise ValueError("basin vectors must have the same shape")
 
-    inner = float(np.sum(np.sqrt(p * q + eps)))
+    if _fisher_rao_kernel is not None:
+        return float(_fisher_rao_kernel(a, b, eps))
+
+    p = _basin_to_simplex(a, eps=eps, out=_scratch(a.size, 0))
+    q = _basin_to_simplex(b, eps=eps, out=_scratch(b.size, 1))
+
+    # sum(sqrt(p*q + eps)), accumulated in p's scratch buffer
+    np.multiply(p, q, out=p)
+    p += np.float32(eps)
+    np.sqrt(p, out=p)
+    inner = float(p.sum())
     inner = float(np.clip(inner, -1.0 + 1e-6, 1.0 - 1e-6))
     return float(2.0 * math.acos(inner))
 
 
+def basin_to_sqrt_simplex(basin: np.ndarray, *, eps: float = 1e-8) -> np.ndarray:
+    """Embed a basin on the unit sphere as sqrt(p), p its simplex projection.
+
+    In this representation the Fisher-Rao distance is just an angle, so basins
+    that are compared repeatedly can be embedded once and then compared with
+    `fisher_rao_distance_fast` (or a single matmul against a stacked matrix).
+    """
+    p = _basin_to_simplex(basin, eps=eps)
+    np.sqrt(p, out=p)
+    return p
+
+
+def fisher_rao_distance_fast(a_sqrt: np.ndarray, b_sqrt: np.ndarray) -> float:
+    """`fisher_rao_distance` for basins already passed through
+    `basin_to_sqrt_simplex`: 2 arccos(a · b), one dot product.
+
+    Agrees with `fisher_rao_distance` up to its eps smoothing term, which adds
+    roughly D·sqrt(eps) to the inner product.
+    """
+    inner = float(np.dot(a_sqrt, b_sqrt))
+    inner = min(max(inner, -1.0 + 1e-6), 1.0 - 1e-6)
+    return float(2.0 * math.acos(inner))
+
+
 def measure_phi_from_basin(basin: np.ndarray, *, eps: float = 1e-8) -> float:
     """Heuristic Φ (integration) measurement from a single basin signature.
 
@@ -60,11 +126,14 @@ def measure_phi_from_basin(basin: np.ndarray, *, eps: float = 1e-8) -> float:
     - Φ ≈ 1: energy concentrated in fewer dimensions (high integration)
     """
 
-    p = _basin_to_simplex(basin, eps=eps)
-    if p.size == 0:
+    x = np.asarray(basin, dtype=np.float32).ravel()
+    if x.size == 0:
         return 0.0
 
-    h = float(-np.sum(p * np.log(p + eps)))
+    p = _basin_to_simplex(x, eps=eps, out=_scratch(x.size, 0))
+    # p log p in one ufunc pass; xlogy is exact at p = 0, so no eps shift
+    plogp = xlogy(p, p, out=_scratch(x.size, 1))
+    h = float(-plogp.sum())
     h_max = float(math.log(float(p.size)))
     if h_max <= 0.0:
         return 0.0
@@ -84,8 +153,9 @@ def measure_kappa_from_basin(basin: np.ndarray) -> float:
     where κ* is vendored in `qsearch.core.constants`.
     """
 
-    x = np.asarray(basin, dtype=np.float32)
-    n = float(np.linalg.norm(x))
+    x = np.ascontiguousarray(basin, dtype=np.float32).ravel()
+    # sqrt of one BLAS sdot; np.linalg.norm takes a slower generic path
+    n = math.sqrt(float(np.dot(x, x)))
     if not math.isfinite(n):
         return 0.0
     return float(max(0.0, KAPPA_STAR * n))
@@ -2,13 +2,35 @@ from __future__ import annotations
 
 import numpy as np
 
+try:
+    from ._metrics_numba import basin_distance_kernel as _basin_distance_kernel
+except ImportError:  # numba is optional; fall back to the NumPy path
+    _basin_distance_kernel = None
+
 
 def basin_distance(a: np.ndarray, b: np.ndarray) -> float:
     a = np.asarray(a, dtype=np.float32)
     b = np.asarray(b, dtype=np.float32)
+    if _basin_distance_kernel is not None and a.ndim == 1 and a.shape == b.shape:
+        return float(_basin_distance_kernel(a, b))
     na = float(np.linalg.norm(a))
     nb = float(np.linalg.norm(b))
     if na == 0.0 or nb == 0.0:
         return float("inf")
     c = float(np.clip(np.dot(a, b) / (na * nb), -1.0, 1.0))
     return float(np.arccos(c))
+
+
+def basin_distances(query: np.ndarray, basins: np.ndarray) -> np.ndarray:
+    """`basin_distance` from `query` to every row of `basins` in one matmul."""
+    q = np.asarray(query, dtype=np.float32)
+    m = np.asarray(basins, dtype=np.float32).reshape(-1, q.shape[0])
+    nq = float(np.linalg.norm(q))
+    nm = np.linalg.norm(m, axis=1)
+    if nq == 0.0:
+        return np.full(m.shape[0], np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = (m @ q).astype(np.float64) / (nm * nq)
+    d = np.arccos(np.clip(c, -1.0, 1.0))
+    d[nm == 0.0] = np.inf
+    return d
@@ -1,35 +1,61 @@
 from __future__ import annotations
 
-from qsearch.index.models import Document
+import time
+
 from qsearch.index.storage import DocumentStore
 
 
 class SqlAlchemyPipeline:
-    def __init__(self, db_url: str | None = None):
+    """Writes crawled documents in batches, one upsert transaction per flush.
+
+    Items are buffered until `batch_size` accumulate or `flush_seconds` pass
+    since the last flush, and whatever remains is written when the spider
+    closes.
+    """
+
+    def __init__(
+        self,
+        db_url: str | None = None,
+        batch_size: int = 500,
+        flush_seconds: float = 5.0,
+    ):
         self.store = DocumentStore(db_url=db_url)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._buf: list[dict] = []
+        self._last_flush = time.monotonic()
 
     @classmethod
     def from_crawler(cls, crawler):
-        db_url = crawler.settings.get("QSEARCH_DB_URL")
-        return cls(db_url=db_url)
+        settings = crawler.settings
+        return cls(
+            db_url=settings.get("QSEARCH_DB_URL"),
+            batch_size=settings.getint("QSEARCH_PIPELINE_BATCH_SIZE", 500),
+            flush_seconds=settings.getfloat("QSEARCH_PIPELINE_FLUSH_SECONDS", 5.0),
+        )
 
     def process_item(self, item, spider):
-        doc = Document(
-            doc_id=item["doc_id"],
-            url=item["url"],
-            title=item.get("title", ""),
-            text=item.get("text", ""),
-            basin=item["basin"],
-            phi=float(item.get("phi", 0.0)),
+        self._buf.append(
+            {
+                "doc_id": item["doc_id"],
+                "url": item["url"],
+                "title": item.get("title", ""),
+                "text": item.get("text", ""),
+                "basin": item["basin"],
+                "phi": float(item.get("phi", 0.0)),
+            }
         )
-        with self.store.session() as s:
-            existing = s.get(Document, doc.doc_id)
-            if existing is None:
-                s.add(doc)
-            else:
-                existing.url = doc.url
-                existing.title = doc.title
-                existing.text = doc.text
-                existing.basin = doc.basin
-                existing.phi = doc.phi
+        if (
+            len(self._buf) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self._flush()
         return item
+
+    def close_spider(self, spider):
+        self._flush()
+
+    def _flush(self) -> None:
+        rows, self._buf = self._buf, []
+        self._last_flush = time.monotonic()
+        self.store.upsert_documents(rows)
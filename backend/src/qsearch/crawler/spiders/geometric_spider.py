@@ -1,14 +1,13 @@
 from __future__ import annotations
 
-import hashlib
-
 import scrapy
-from bs4 import BeautifulSoup
 from scrapy.linkextractors import LinkExtractor
 
 from qsearch.core.encoding import encode_text_to_basin
 from qsearch.core.geometry import measure_phi_from_basin
 from qsearch.crawler.items import DocumentItem
+from qsearch.html import extract_title_and_text
+from qsearch.index.models import doc_id_for_url, pack_basin
 
 
 class GeometricSpider(scrapy.Spider):
@@ -25,22 +24,22 @@ class GeometricSpider(scrapy.Spider):
         self.link_extractor = LinkExtractor()
 
     def parse(self, response, depth: int = 0):
-        soup = BeautifulSoup(response.body, "lxml")
-        for tag in soup(["script", "style", "nav", "footer"]):
-            tag.decompose()
-        title = (soup.title.string or "").strip() if soup.title else ""
-        text = soup.get_text(separator=" ", strip=True)
+        # response.text is decoded per the header, <meta> charset or BOM
+        title, text = extract_title_and_text(
+            response.text, drop=("script", "style", "nav", "footer")
+        )
 
+        # Stored and encoded alike, as in the learner and hybrid search
+        text = text[:5000]
         basin = encode_text_to_basin(text)
         phi = measure_phi_from_basin(basin)
 
-        doc_id = hashlib.sha256(response.url.encode("utf-8")).hexdigest()[:16]
         yield DocumentItem(
-            doc_id=doc_id,
+            doc_id=doc_id_for_url(response.url),
             url=response.url,
             title=title,
-            text=text[:5000],
-            basin=basin.tolist(),
+            text=text,
+            basin=pack_basin(basin),
             phi=phi,
         )
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+_log = logging.getLogger("qsearch.html")
+
+# Page chrome that carries no content worth encoding
+BOILERPLATE_TAGS = ("script", "style", "nav", "footer", "header")
+
+# Pages are stored and encoded from their first 5000 characters of text, so
+# reading further into a multi-megabyte page is wasted transfer and parse time
+MAX_PAGE_BYTES = 512 * 1024
+
+
+async def fetch_capped(client: httpx.AsyncClient, url: str, max_bytes: int) -> str:
+    """GET `url`, reading at most `max_bytes` of the body (see `MAX_PAGE_BYTES`).
+
+    The body is decoded with the Content-Type charset (UTF-8 without a usable
+    one), since the parser would otherwise read every page as UTF-8; a
+    character split by the cap is replaced.
+    """
+    buf = bytearray()
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            buf += chunk
+            if len(buf) >= max_bytes:
+                break
+        encoding = response.encoding
+    del buf[max_bytes:]
+    return buf.decode(encoding, errors="replace")
+
+
+def _extract_bs4(html: bytes | str, drop: tuple[str, ...]) -> tuple[str, str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    title = (soup.title.string or "").strip() if soup.title else ""
+    for tag in soup(list(drop)):
+        tag.decompose()
+    return title, soup.get_text(separator=" ", strip=True)
+
+
+def extract_title_and_text(
+    html: bytes | str, *, drop: tuple[str, ...] = BOILERPLATE_TAGS
+) -> tuple[str, str]:
+    """`<title>` and visible text of an HTML document, whitespace-joined.
+
+    Parsed with selectolax (lexbor, in C); BeautifulSoup is only used if that
+    parser rejects the document.
+    """
+    try:
+        tree = LexborHTMLParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node is not None else ""
+        for node in tree.css(",".join(drop)):
+            node.decompose()
+        root = tree.body or tree.root
+        text = root.text(separator=" ", strip=True) if root is not None else ""
+        return title, text
+    except Exception as e:
+        _log.debug("selectolax failed (%s); falling back to BeautifulSoup", e)
+        return _extract_bs4(html, drop)
+
+
+def extract_text(html: bytes | str, *, drop: tuple[str, ...] = BOILERPLATE_TAGS) -> str:
+    """Visible text of an HTML document; see `extract_title_and_text`."""
+    return extract_title_and_text(html, drop=drop)[1]
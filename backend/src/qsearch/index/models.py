@@ -1,9 +1,62 @@
 from __future__ import annotations
 
-from typing import Any
+import hashlib
+from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Float, Index, String
+import numpy as np
+from sqlalchemy import DateTime, Float, Index, LargeBinary, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
+
+# Basins are stored as raw little-endian float32 bytes (4 bytes per dimension).
+BASIN_DTYPE = np.dtype("<f4")
+
+
+def pack_basin(basin: np.ndarray) -> bytes:
+    """Encode a basin vector for the `documents.basin` column."""
+    return np.asarray(basin, dtype=BASIN_DTYPE).tobytes()
+
+
+def doc_id_for_url(url: str) -> str:
+    """Stable `documents.doc_id` for a URL.
+
+    Persisted as the primary key, so this must stay SHA-256 for existing rows
+    to keep matching; transient fingerprints use blake2b (see `qsearch.cache`).
+    """
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class BasinType(TypeDecorator):
+    """Basin column that loads straight to a float32 array.
+
+    Stored as `pack_basin` bytes; rows come back as read-only zero-copy views
+    over the fetched buffer, so hydrating a `Document` never builds a list.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, (bytes, bytearray, memoryview)):
+            return value
+        return pack_basin(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=BASIN_DTYPE)
+
+    def compare_values(self, x, y):
+        # The default `x == y` is elementwise on arrays
+        if x is None or y is None:
+            return x is y
+        return np.array_equal(
+            self.process_bind_param(x, None), self.process_bind_param(y, None)
+        )
 
 
 class Base(DeclarativeBase):
@@ -17,12 +70,24 @@ class Document(Base):
     url: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     title: Mapped[str] = mapped_column(String, default="")
     text: Mapped[str] = mapped_column(String, default="")
-    basin: Mapped[Any] = mapped_column(JSON, nullable=False)
+    basin: Mapped[np.ndarray] = mapped_column(BasinType, nullable=False)
     phi: Mapped[float] = mapped_column(Float, default=0.0)
+    # Set on every ORM/Core write; NULL only for rows predating the column.
+    # max(updated_at) versions the in-memory BasinIndex snapshot.
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow
+    )
 
     __table_args__ = (
         Index("idx_documents_url", "url"),
         Index("idx_documents_phi", "phi"),
+        Index("idx_documents_updated", "updated_at"),
+        # Lets BasinIndex.reload scan (doc_id, basin) without reading text. The
+        # blob is an INCLUDE payload, not a key; SQLite has no INCLUDE, and a
+        # bare (doc_id) index there would only duplicate the primary key.
+        Index(
+            "idx_documents_basin_cover", "doc_id", postgresql_include=["basin"]
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -0,0 +1,84 @@
+"""On-disk snapshots of the BasinIndex matrix for fast cold starts.
+
+A snapshot is a directory of `.npy` arrays plus a `meta.json` naming the
+`documents` version it was built from. A restarted process whose database is
+still at that version memory-maps the arrays instead of scanning every row;
+the OS page cache then keeps the hot matrix shared between processes.
+
+Each save writes a fresh directory and then atomically repoints a small
+`<kind>.current` file at it, so readers never see a half-written snapshot.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+_log = logging.getLogger("qsearch.snapshot")
+
+_ARRAYS = ("basins", "norms", "scales")
+
+
+def _version_key(version: tuple) -> list:
+    return [v.isoformat() if isinstance(v, datetime) else v for v in version]
+
+
+def save_snapshot(
+    root: str | os.PathLike,
+    kind: str,
+    version: tuple,
+    doc_ids: list[str],
+    basins: np.ndarray,
+    norms: np.ndarray,
+    scales: np.ndarray,
+) -> None:
+    """Persist one index snapshot, replacing the previous one of this `kind`."""
+    root = Path(root)
+    target = root / f"{kind}-{uuid.uuid4().hex}"
+    target.mkdir(parents=True)
+    for name, arr in zip(_ARRAYS, (basins, norms, scales), strict=True):
+        np.save(target / f"{name}.npy", np.ascontiguousarray(arr))
+    meta = {"version": _version_key(version), "doc_ids": doc_ids}
+    (target / "meta.json").write_text(json.dumps(meta))
+
+    pointer = root / f"{kind}.current"
+    previous = pointer.read_text() if pointer.exists() else None
+    tmp = root / f".{kind}.current.{uuid.uuid4().hex}"
+    tmp.write_text(target.name)
+    os.replace(tmp, pointer)
+    if previous and previous != target.name:
+        # Processes that already mapped it keep their (unlinked) pages
+        shutil.rmtree(root / previous, ignore_errors=True)
+
+
+def load_snapshot(
+    root: str | os.PathLike, kind: str, version: tuple, dim: int
+) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray] | None:
+    """(doc_ids, basins, norms, scales) of a snapshot taken at `version`.
+
+    Arrays are copy-on-write memory maps. Returns None if there is no usable
+    snapshot for this version.
+    """
+    root = Path(root)
+    try:
+        target = root / (root / f"{kind}.current").read_text()
+        meta = json.loads((target / "meta.json").read_text())
+        if meta["version"] != _version_key(version):
+            return None
+        basins, norms, scales = (
+            np.load(target / f"{name}.npy", mmap_mode="c") for name in _ARRAYS
+        )
+    except (OSError, ValueError, KeyError) as e:
+        _log.debug("No usable %s index snapshot in %s: %s", kind, root, e)
+        return None
+    doc_ids = meta["doc_ids"]
+    if basins.shape != (len(doc_ids), dim) or len(norms) != len(doc_ids):
+        return None
+    return doc_ids, basins, norms, scales
@@ -1,12 +1,43 @@
 from __future__ import annotations
 
+import logging
 import os
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import (
+    Engine,
+    LargeBinary,
+    create_engine,
+    event,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from .models import Base
+from .models import Base, Document, pack_basin
+
+_log = logging.getLogger("qsearch.storage")
+
+_MIGRATE_BATCH = 1000
+
+# SQLITE_MAX_VARIABLE_NUMBER before SQLite 3.32; multi-row statements are
+# split so no single one binds more parameters than this
+SQLITE_MAX_VARIABLES = 999
+
+# WAL lets searches read while the crawler writes, and NORMAL sync fsyncs on
+# checkpoint rather than on every commit (still durable against app crashes).
+# The page cache (64 MiB) and mmap (256 MiB) keep hot basin pages in memory.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
 
 
 def _default_db_url() -> str:
@@ -20,6 +51,84 @@ def _default_db_url() -> str:
     return url
 
 
+def set_sqlite_pragmas(dbapi_conn, _record) -> None:
+    """`connect` event hook applying `SQLITE_PRAGMAS` to each new connection."""
+    cur = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cur.execute(pragma)
+    finally:
+        cur.close()
+
+
+def _migrate_json_basins(engine: Engine) -> None:
+    """Convert a legacy JSON `documents.basin` column to packed float32 bytes."""
+    columns = {c["name"]: c for c in inspect(engine).get_columns("documents")}
+    if "basin" not in columns or isinstance(columns["basin"]["type"], LargeBinary):
+        return
+
+    postgres = engine.dialect.name == "postgresql"
+    _log.info("Migrating documents.basin from JSON to float32 bytes")
+    with engine.begin() as conn:
+        blob_type = "BYTEA" if postgres else "BLOB"
+        conn.execute(text(f"ALTER TABLE documents ADD COLUMN basin_f32 {blob_type}"))
+        rows = conn.execute(
+            text("SELECT doc_id, basin FROM documents").execution_options(
+                stream_results=True
+            )
+        )
+        update = text("UPDATE documents SET basin_f32 = :basin WHERE doc_id = :doc_id")
+        for batch in rows.partitions(_MIGRATE_BATCH):
+            conn.execute(
+                update,
+                [
+                    {
+                        "doc_id": doc_id,
+                        "basin": pack_basin(
+                            orjson.loads(basin) if isinstance(basin, str) else basin
+                        ),
+                    }
+                    for doc_id, basin in batch
+                ],
+            )
+        conn.execute(text("ALTER TABLE documents DROP COLUMN basin"))
+        conn.execute(text("ALTER TABLE documents RENAME COLUMN basin_f32 TO basin"))
+        if postgres:
+            conn.execute(text("ALTER TABLE documents ALTER COLUMN basin SET NOT NULL"))
+
+
+def _add_updated_at(engine: Engine) -> None:
+    """Add `documents.updated_at` to tables created before it."""
+    columns = {c["name"] for c in inspect(engine).get_columns("documents")}
+    if "updated_at" in columns:
+        return
+
+    _log.info("Adding documents.updated_at")
+    ts_type = (
+        "TIMESTAMP WITH TIME ZONE"
+        if engine.dialect.name == "postgresql"
+        else "DATETIME"
+    )
+    with engine.begin() as conn:
+        # Existing rows stay NULL, which max() ignores
+        conn.execute(text(f"ALTER TABLE documents ADD COLUMN updated_at {ts_type}"))
+
+
+def _drop_keyed_basin_cover(engine: Engine) -> None:
+    """Drop an `idx_documents_basin_cover` built with the basin blob as a key.
+
+    `DocumentStore` recreates it with the blob as an INCLUDE column, on
+    PostgreSQL only.
+    """
+    for index in inspect(engine).get_indexes("documents"):
+        if index["name"] == "idx_documents_basin_cover" and (
+            "basin" in index["column_names"]
+        ):
+            _log.info("Rebuilding idx_documents_basin_cover without a basin key")
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX idx_documents_basin_cover"))
+
+
 class DocumentStore:
     def __init__(self, db_url: str | None = None):
         self.db_url = db_url or _default_db_url()
@@ -28,8 +137,29 @@ class DocumentStore:
             db_dir = os.path.dirname(db_path)
             if db_dir:
                 os.makedirs(db_dir, exist_ok=True)
-        self.engine = create_engine(self.db_url)
-        Base.metadata.create_all(self.engine)
+        engine_kwargs = {}
+        if not self.db_url.startswith("sqlite"):
+            engine_kwargs.update(pool_pre_ping=True, pool_size=20, max_overflow=10)
+        if self.db_url.startswith("postgresql+psycopg2"):
+            # Page executemany() through psycopg2's execute_batch instead of
+            # one round-trip per parameter set.
+            engine_kwargs["executemany_mode"] = "values_plus_batch"
+            # Also registered as psycopg2's json/jsonb loader on each connection,
+            # so raw text() queries get lists/dicts decoded in C at fetch time.
+            engine_kwargs["json_deserializer"] = orjson.loads
+        self.engine = create_engine(self.db_url, **engine_kwargs)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", set_sqlite_pragmas)
+        # Only the documents table is ours; `users` and the federation tables
+        # are created by their API modules with their own schemas.
+        Base.metadata.create_all(self.engine, tables=[Document.__table__])
+        _migrate_json_basins(self.engine)
+        _add_updated_at(self.engine)
+        _drop_keyed_basin_cover(self.engine)
+        # create_all skips tables that already exist, and with them any
+        # indexes added to the model since
+        for index in Document.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
 
     @contextmanager
     def session(self) -> Session:
@@ -42,3 +172,71 @@ class DocumentStore:
             raise
         finally:
             s.close()
+
+    def _statement_batches(self, rows: list[dict]) -> list[list[dict]]:
+        """`rows` split into multi-VALUES batches the dialect can bind at once."""
+        if self.engine.dialect.name != "sqlite":
+            return [rows]
+        # Columns missing from a row still bind their Python-side default
+        size = max(1, SQLITE_MAX_VARIABLES // len(Document.__table__.columns))
+        return [rows[i : i + size] for i in range(0, len(rows), size)]
+
+    def insert_documents(self, rows: list[dict]) -> int:
+        """Insert `documents` rows in one transaction, skipping existing ones.
+
+        Rows whose doc_id or url is already stored are left untouched; the
+        database enforces that instead of a lookup per row. Returns the number
+        of rows actually inserted.
+        """
+        if not rows:
+            return 0
+        dialect = self.engine.dialect.name
+        with self.session() as s:
+            if dialect in ("postgresql", "sqlite"):
+                ins = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                inserted = 0
+                for batch in self._statement_batches(rows):
+                    stmt = ins(Document).values(batch).on_conflict_do_nothing()
+                    inserted += s.execute(stmt).rowcount
+                return inserted
+            else:
+                existing = set(
+                    s.scalars(
+                        select(Document.doc_id).where(
+                            Document.doc_id.in_([r["doc_id"] for r in rows])
+                        )
+                    )
+                )
+                rows = [r for r in rows if r["doc_id"] not in existing]
+                if not rows:
+                    return 0
+                stmt = insert(Document).values(rows)
+            return s.execute(stmt).rowcount
+
+    def upsert_documents(self, rows: list[dict]) -> None:
+        """Insert or overwrite `documents` rows, keyed by doc_id, in one transaction.
+
+        Rows go out as multi-VALUES statements (one, except on SQLite). Later
+        rows win when a doc_id repeats within `rows`.
+        """
+        # ON CONFLICT cannot touch the same row twice in one statement
+        rows = list({r["doc_id"]: r for r in rows}.values())
+        if not rows:
+            return
+        dialect = self.engine.dialect.name
+        with self.session() as s:
+            if dialect in ("postgresql", "sqlite"):
+                ins = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                # ON CONFLICT's SET skips column onupdate hooks, so updated_at
+                # is taken from the incoming row's insert default instead
+                updated = {"url", "title", "text", "basin", "phi", "updated_at"}
+                for batch in self._statement_batches(rows):
+                    stmt = ins(Document).values(batch)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[Document.doc_id],
+                        set_={c: stmt.excluded[c] for c in updated},
+                    )
+                    s.execute(stmt)
+            else:
+                for row in rows:
+                    s.merge(Document(**row))
@@ -7,20 +7,27 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 import httpx
-from bs4 import BeautifulSoup
-
-from qsearch.core.encoding import encode_text_to_basin
-from qsearch.core.metrics import basin_distance
+import numpy as np
+
+from qsearch.cache import SearchCache
+from qsearch.core.encoding import (
+    batch_encode_texts,
+    encode_query,
+    encode_text_to_basin,
+)
+from qsearch.core.metrics import basin_distances
+from qsearch.html import MAX_PAGE_BYTES, extract_text, fetch_capped
 from qsearch.search.serper import SerperClient, SerperResult
 
 _log = logging.getLogger("qsearch.hybrid")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HybridResult:
     url: str
     title: str
@@ -48,10 +55,37 @@ class HybridSearchOrchestrator:
         serper_api_key: Optional[str] = None,
         fetch_content: bool = True,
         max_fetch: int = 10,
+        cache: Optional[SearchCache] = None,
     ):
         self.serper = SerperClient(api_key=serper_api_key)
         self.fetch_content = fetch_content
         self.max_fetch = max_fetch
+        # Per-URL page encodings, shared across queries that surface the same URL
+        self.cache = cache
+        # One pooled client for all page fetches: keep-alive and HTTP/2
+        # multiplexing spare each fetch its own TCP/TLS handshake. Created on
+        # first use in each event loop, since its connections belong to one.
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=10.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                headers={"User-Agent": "qsearch/1.0"},
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self.serper.aclose()
 
     async def search(
         self,
@@ -59,6 +93,7 @@ class HybridSearchOrchestrator:
         *,
         limit: int = 10,
         alpha: float = 0.5,  # Weight for serper rank vs basin distance
+        defer: Optional[Callable[..., Any]] = None,
     ) -> list[HybridResult]:
         """
         Perform hybrid search.
@@ -67,6 +102,8 @@ class HybridSearchOrchestrator:
             query: Search query
             limit: Number of results to return
             alpha: Blending factor (0=pure basin, 1=pure serper rank)
+            defer: Scheduler for cache writes, e.g. `BackgroundTasks.add_task`;
+                without one they are awaited inline
 
         Returns:
             List of hybrid results sorted by hybrid_score
@@ -79,59 +116,65 @@ class HybridSearchOrchestrator:
             return []
 
         # 2. Encode query to basin
-        query_basin = encode_text_to_basin(query)
+        query_basin = encode_query(query)
 
-        # 3. Fetch and process results
-        results = []
+        # 3. Collect (serper result, content, content basin) candidates
+        candidates: list[tuple[SerperResult, str, np.ndarray]] = []
 
         if self.fetch_content:
-            # Fetch content in parallel
-            fetch_tasks = [
-                self._fetch_and_encode(r, query_basin)
-                for r in serper_response.results[: self.max_fetch]
-            ]
+            top = serper_response.results[: self.max_fetch]
+            pages = await self._cached_pages([r.url for r in top])
+
+            # Cached pages skip the fetch; the rest are fetched in parallel
+            misses = []
+            for r, page in zip(top, pages, strict=True):
+                if page is None:
+                    misses.append(r)
+                else:
+                    basin = np.asarray(page["basin"], dtype=np.float32)
+                    candidates.append((r, page["content"], basin))
+
+            fetch_tasks = [self._fetch_and_encode(r) for r in misses]
             fetched = await asyncio.gather(*fetch_tasks, return_exceptions=True)
 
-            for i, result in enumerate(fetched):
-                if isinstance(result, Exception):
-                    _log.debug(
-                        "Failed to fetch %s: %s", serper_response.results[i].url, result
-                    )
+            new_pages = {}
+            for r, outcome in zip(misses, fetched, strict=True):
+                if isinstance(outcome, Exception):
+                    _log.debug("Failed to fetch %s: %s", r.url, outcome)
                     continue
-                if result is not None:
-                    results.append(result)
+                content, basin, from_page = outcome
+                candidates.append((r, content, basin))
+                if from_page:
+                    new_pages[r.url] = {"content": content, "basin": basin}
+
+            if new_pages and self._cache_enabled:
+                if defer is not None:
+                    defer(self.cache.set_pages, new_pages)
+                else:
+                    await self.cache.set_pages(new_pages)
         else:
-            # Use snippets only
-            for r in serper_response.results:
-                content = r.snippet
-                content_basin = encode_text_to_basin(content)
-                dist = basin_distance(query_basin, content_basin)
-
-                results.append(
-                    HybridResult(
-                        url=r.url,
-                        title=r.title,
-                        snippet=r.snippet,
-                        content=content,
-                        serper_position=r.position,
-                        basin_distance=dist,
-                        hybrid_score=0.0,  # Will compute below
-                    )
-                )
+            # Use snippets only, encoded as one matrix
+            results = serper_response.results
+            basins = batch_encode_texts([r.snippet for r in results])
+            candidates.extend(
+                (r, r.snippet, basin) for r, basin in zip(results, basins, strict=True)
+            )
 
-        if not results:
+        if not candidates:
             return []
 
         # 4. Compute hybrid scores
+        # All candidate distances in one (K, D) @ (D,) pass
+        dists = basin_distances(query_basin, np.stack([b for _, _, b in candidates]))
         # Normalize serper position to 0-1 (lower is better)
-        max_pos = max(r.serper_position for r in results)
+        max_pos = max(r.position for r, _, _ in candidates)
         # Normalize basin distance to 0-1 (lower is better)
-        max_dist = max(r.basin_distance for r in results) or 1.0
+        max_dist = float(dists.max()) or 1.0
 
         scored_results = []
-        for r in results:
-            pos_score = r.serper_position / max_pos  # 0-1, lower is better
-            dist_score = r.basin_distance / max_dist  # 0-1, lower is better
+        for (r, content, _), d in zip(candidates, dists.tolist(), strict=True):
+            pos_score = r.position / max_pos  # 0-1, lower is better
+            dist_score = d / max_dist  # 0-1, lower is better
 
             # Hybrid score: weighted combination (lower is better)
             hybrid = alpha * pos_score + (1 - alpha) * dist_score
@@ -141,9 +184,9 @@ class HybridSearchOrchestrator:
                     url=r.url,
                     title=r.title,
                     snippet=r.snippet,
-                    content=r.content,
-                    serper_position=r.serper_position,
-                    basin_distance=r.basin_distance,
+                    content=content,
+                    serper_position=r.position,
+                    basin_distance=d,
                     hybrid_score=hybrid,
                 )
             )
@@ -152,56 +195,35 @@ class HybridSearchOrchestrator:
         scored_results.sort(key=lambda x: x.hybrid_score)
         return scored_results[:limit]
 
+    @property
+    def _cache_enabled(self) -> bool:
+        return self.cache is not None and self.cache.enabled
+
+    async def _cached_pages(self, urls: list[str]) -> list[Optional[dict]]:
+        if not self._cache_enabled:
+            return [None] * len(urls)
+        return await self.cache.get_pages(urls)
+
+    async def _fetch_page(self, url: str) -> str:
+        return await fetch_capped(self._http_client(), url, MAX_PAGE_BYTES)
+
     async def _fetch_and_encode(
-        self,
-        serper_result: SerperResult,
-        query_basin,
-    ) -> Optional[HybridResult]:
-        """Fetch page content and compute basin distance."""
-        try:
-            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-                response = await client.get(
-                    serper_result.url,
-                    headers={"User-Agent": "qsearch/1.0"},
-                )
-                response.raise_for_status()
-
-                # Parse HTML
-                soup = BeautifulSoup(response.content, "lxml")
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
-
-                text = soup.get_text(separator=" ", strip=True)[:5000]
-
-                # Encode to basin
-                content_basin = encode_text_to_basin(text)
-                dist = basin_distance(query_basin, content_basin)
-
-                return HybridResult(
-                    url=serper_result.url,
-                    title=serper_result.title,
-                    snippet=serper_result.snippet,
-                    content=text[:500],
-                    serper_position=serper_result.position,
-                    basin_distance=dist,
-                    hybrid_score=0.0,
-                )
+        self, serper_result: SerperResult
+    ) -> tuple[str, np.ndarray, bool]:
+        """Fetch page content and encode it to a basin.
 
+        Returns (content, basin, from_page); from_page is False when the fetch
+        failed and the snippet was encoded instead, which is not cached.
+        """
+        try:
+            html = await self._fetch_page(serper_result.url)
+            text = extract_text(html)[:5000]
+            return text[:500], encode_text_to_basin(text), True
         except Exception as e:
             _log.debug("Failed to fetch %s: %s", serper_result.url, e)
             # Fall back to snippet
-            content_basin = encode_text_to_basin(serper_result.snippet)
-            dist = basin_distance(query_basin, content_basin)
-
-            return HybridResult(
-                url=serper_result.url,
-                title=serper_result.title,
-                snippet=serper_result.snippet,
-                content=serper_result.snippet,
-                serper_position=serper_result.position,
-                basin_distance=dist,
-                hybrid_score=0.0,
-            )
+            snippet = serper_result.snippet
+            return snippet, encode_text_to_basin(snippet), False
 
     def search_sync(
         self,
@@ -210,5 +232,16 @@ class HybridSearchOrchestrator:
         limit: int = 10,
         alpha: float = 0.5,
     ) -> list[HybridResult]:
-        """Synchronous wrapper for search."""
-        return asyncio.run(self.search(query, limit=limit, alpha=alpha))
+        """Synchronous wrapper for search.
+
+        Each call runs in its own event loop, and closes the HTTP clients it
+        opened there before that loop ends.
+        """
+
+        async def run() -> list[HybridResult]:
+            try:
+                return await self.search(query, limit=limit, alpha=alpha)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
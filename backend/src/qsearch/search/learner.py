@@ -11,25 +11,31 @@ Provides:
 from __future__ import annotations
 
 import asyncio
-import hashlib
+import heapq
 import logging
 import os
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 
 import httpx
-from bs4 import BeautifulSoup
 
+from qsearch.bloom import ScalableBloomFilter
 from qsearch.core.encoding import encode_text_to_basin
 from qsearch.core.geometry import measure_phi_from_basin
-from qsearch.index.models import Document
+from qsearch.html import MAX_PAGE_BYTES, extract_title_and_text, fetch_capped
+from qsearch.index.models import doc_id_for_url, pack_basin
 from qsearch.index.storage import DocumentStore
 
 _log = logging.getLogger("qsearch.learner")
 
+# Most recently queued URLs, checked exactly before the Bloom filter
+RECENT_URLS = 1024
 
-@dataclass
+
+@dataclass(slots=True)
 class LearningStats:
     urls_queued: int = 0
     urls_crawled: int = 0
@@ -38,7 +44,7 @@ class LearningStats:
     last_crawl_time: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CrawlTask:
     url: str
     priority: int = 0
@@ -63,46 +69,82 @@ class ContinuousLearner:
         db_url: Optional[str] = None,
         max_queue_size: int = 1000,
         crawl_delay: float = 1.0,
+        concurrency: int = 4,
+        batch_size: int = 50,
+        flush_seconds: float = 5.0,
     ):
         self.store = store or DocumentStore(db_url=db_url)
         self.max_queue_size = max_queue_size
         self.crawl_delay = crawl_delay
-
-        self._queue: list[CrawlTask] = []
-        self._seen_urls: set[str] = set()
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+
+        # Min-heap of (-priority, seq, task): highest priority first, FIFO on ties
+        self._queue: list[tuple[int, int, CrawlTask]] = []
+        self._seq = 0
+        # Probabilistic dedup: a stray false positive skips a URL, but memory
+        # stays a few bytes per URL however long the learner runs.
+        self._seen_urls = ScalableBloomFilter(
+            initial_capacity=max_queue_size * 10, error_rate=1e-6
+        )
+        # Hybrid results repeat URLs across nearby queries; a set lookup turns
+        # those away without hashing for the Bloom filter.
+        self._recent_urls: deque[str] = deque()
+        self._recent_set: set[str] = set()
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
         self.stats = LearningStats()
+        # Crawled documents awaiting one batched INSERT
+        self._pending: list[dict] = []
+        self._last_flush = time.monotonic()
 
     def queue_url(
         self, url: str, priority: int = 0, source: str = "hybrid_search"
     ) -> bool:
         """Add URL to crawl queue."""
-        url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
-
-        if url_hash in self._seen_urls:
+        if url in self._recent_set or url in self._seen_urls:
             return False
 
         if len(self._queue) >= self.max_queue_size:
-            # Remove lowest priority item
-            self._queue.sort(key=lambda x: x.priority, reverse=True)
-            self._queue.pop()
+            self._evict_lowest()
 
-        self._queue.append(CrawlTask(url=url, priority=priority, source=source))
-        self._seen_urls.add(url_hash)
+        task = CrawlTask(url=url, priority=priority, source=source)
+        heapq.heappush(self._queue, (-priority, self._seq, task))
+        self._seq += 1
+        self._seen_urls.add(url)
+        self._remember(url)
         self.stats.urls_queued += 1
 
         _log.debug("Queued URL: %s (priority=%d, source=%s)", url, priority, source)
         return True
 
+    def _remember(self, url: str) -> None:
+        self._recent_urls.append(url)
+        self._recent_set.add(url)
+        if len(self._recent_urls) > RECENT_URLS:
+            self._recent_set.discard(self._recent_urls.popleft())
+
+    def _evict_lowest(self) -> None:
+        """Drop the lowest-priority (newest on ties) task from the full queue."""
+        # The heap only orders its minimum, so the maximum is a linear scan;
+        # this runs only while the queue is at capacity.
+        worst = max(range(len(self._queue)), key=self._queue.__getitem__)
+        last = self._queue.pop()
+        if worst < len(self._queue):
+            self._queue[worst] = last
+            heapq.heapify(self._queue)
+
     def queue_from_hybrid_results(self, results: list) -> int:
         """Queue URLs from hybrid search results for learning."""
+        n = len(results)
         count = 0
         for i, result in enumerate(results):
-            url = getattr(result, "url", None) or result.get("url")
-            if url and self.queue_url(
-                url, priority=len(results) - i, source="hybrid_search"
-            ):
+            # HybridResult objects or their dict form; a blank url on an object
+            # must not fall through to dict access
+            url = result.get("url") if isinstance(result, dict) else result.url
+            if url and self.queue_url(url, priority=n - i, source="hybrid_search"):
                 count += 1
         return count
 
@@ -124,83 +166,117 @@ class ContinuousLearner:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self._flush()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
         _log.info("Continuous learner stopped")
 
+    def _client(self) -> httpx.AsyncClient:
+        # One pooled client for every crawl: keep-alive and HTTP/2 spare each
+        # URL its own DNS lookup and TCP/TLS handshake.
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=15.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                headers={"User-Agent": "qsearch-learner/1.0"},
+            )
+        return self._http
+
     async def _learning_loop(self):
-        """Main learning loop."""
-        while self._running:
-            if not self._queue:
-                await asyncio.sleep(self.crawl_delay)
-                continue
+        """Main learning loop.
 
-            # Get highest priority task
-            self._queue.sort(key=lambda x: x.priority, reverse=True)
-            task = self._queue.pop(0)
+        Tasks start `crawl_delay` apart, highest priority first, with up to
+        `concurrency` crawls in flight so one slow host does not stall the rest.
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        inflight: set[asyncio.Task] = set()
+        try:
+            while self._running:
+                if self._flush_due():
+                    await self._flush()
+
+                if not self._queue:
+                    await asyncio.sleep(self.crawl_delay)
+                    continue
+
+                await slots.acquire()
+                if not self._queue:
+                    slots.release()
+                    continue
+
+                # Get highest priority task
+                _, _, task = heapq.heappop(self._queue)
+                crawl = asyncio.create_task(self._crawl_task(task))
+                inflight.add(crawl)
+                crawl.add_done_callback(inflight.discard)
+                crawl.add_done_callback(lambda _: slots.release())
 
-            try:
-                await self._crawl_and_index(task.url)
-                self.stats.urls_crawled += 1
-                self.stats.last_crawl_time = datetime.utcnow()
-            except Exception as e:
-                _log.error("Failed to crawl %s: %s", task.url, e)
-                self.stats.urls_failed += 1
+                await asyncio.sleep(self.crawl_delay)
+        finally:
+            for crawl in inflight:
+                crawl.cancel()
+
+    def _flush_due(self) -> bool:
+        return bool(self._pending) and (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        )
+
+    async def _flush(self):
+        """Write buffered documents with one INSERT off the event loop."""
+        rows, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if not rows:
+            return
+        try:
+            added = await asyncio.to_thread(self.store.insert_documents, rows)
+        except Exception as e:
+            _log.error("Failed to store %d crawled documents: %s", len(rows), e)
+            return
+        self.stats.documents_added += added
+        _log.info("Indexed %d of %d crawled documents", added, len(rows))
 
-            await asyncio.sleep(self.crawl_delay)
+    async def _crawl_task(self, task: CrawlTask):
+        try:
+            await self._crawl_and_index(task.url)
+            self.stats.urls_crawled += 1
+            self.stats.last_crawl_time = datetime.utcnow()
+        except Exception as e:
+            _log.error("Failed to crawl %s: %s", task.url, e)
+            self.stats.urls_failed += 1
 
     async def _crawl_and_index(self, url: str):
         """Fetch URL content and add to index."""
         try:
-            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-                response = await client.get(
-                    url,
-                    headers={"User-Agent": "qsearch-learner/1.0"},
-                )
-                response.raise_for_status()
-
-                # Parse HTML
-                soup = BeautifulSoup(response.content, "lxml")
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
-
-                title = (soup.title.string or "").strip() if soup.title else ""
-                text = soup.get_text(separator=" ", strip=True)[:5000]
-
-                if len(text) < 100:
-                    _log.debug("Skipping %s - content too short", url)
-                    return
-
-                # Compute basin and phi
-                basin = encode_text_to_basin(text)
-                phi = measure_phi_from_basin(basin)
-
-                # Generate doc_id
-                doc_id = hashlib.sha256(url.encode()).hexdigest()[:16]
-
-                # Check if already exists
-                with self.store.session() as session:
-                    existing = (
-                        session.query(Document)
-                        .filter(Document.doc_id == doc_id)
-                        .first()
-                    )
-                    if existing:
-                        _log.debug("Document already exists: %s", url)
-                        return
-
-                    # Add to database
-                    doc = Document(
-                        doc_id=doc_id,
-                        url=url,
-                        title=title,
-                        text=text,
-                        basin=basin.tolist(),
-                        phi=phi,
-                    )
-                    session.add(doc)
-                    session.commit()
-
-                self.stats.documents_added += 1
-                _log.info("Indexed: %s (phi=%.4f)", url, phi)
+            page = await fetch_capped(self._client(), url, MAX_PAGE_BYTES)
+            title, text = extract_title_and_text(page)
+            text = text[:5000]
+
+            if len(text) < 100:
+                _log.debug("Skipping %s - content too short", url)
+                return
+
+            # Compute basin and phi
+            basin = encode_text_to_basin(text)
+            phi = measure_phi_from_basin(basin)
+
+            doc_id = doc_id_for_url(url)
+            # Buffered for the loop's next batched INSERT; existing doc_ids and
+            # urls are skipped by the database
+            self._pending.append(
+                {
+                    "doc_id": doc_id,
+                    "url": url,
+                    "title": title,
+                    "text": text,
+                    "basin": pack_basin(basin),
+                    "phi": phi,
+                }
+            )
+            _log.debug("Crawled: %s (phi=%.4f)", url, phi)
 
         except Exception as e:
             raise RuntimeError(f"Crawl failed: {e}") from e
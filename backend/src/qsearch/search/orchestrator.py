@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from qsearch.core.encoding import encode_text_to_basin
+from sqlalchemy import func, select
+
+from qsearch.core.encoding import batch_encode_queries
 from qsearch.index.basin_index import BasinIndex
 from qsearch.index.models import Document
 from qsearch.index.storage import DocumentStore
 
+SNIPPET_CHARS = 220
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchResult:
     doc_id: str
     url: str
@@ -19,38 +23,62 @@ class SearchResult:
 
 class SearchOrchestrator:
     def __init__(
-        self, store: DocumentStore | None = None, *, db_url: str | None = None
+        self,
+        store: DocumentStore | None = None,
+        *,
+        db_url: str | None = None,
+        quantize: bool = False,
+        snapshot_dir: str | None = None,
+        snapshot_seconds: float = 300.0,
+        ann: bool = False,
     ):
         if store is not None:
             self.store = store
         else:
             self.store = DocumentStore(db_url=db_url)
-        self.index = BasinIndex(self.store)
+        self.index = BasinIndex(
+            self.store,
+            quantize=quantize,
+            snapshot_dir=snapshot_dir,
+            snapshot_seconds=snapshot_seconds,
+            ann=ann,
+        )
 
     def search(self, query: str, *, limit: int = 10) -> list[SearchResult]:
-        q = encode_text_to_basin(query)
-        hits = self.index.search(q, limit=limit)
-
-        with self.store.session() as s:
-            by_id = {
-                d.doc_id: d
-                for d in s.query(Document)
-                .filter(Document.doc_id.in_([h.doc_id for h in hits]))
-                .all()
-            }
-
-        out: list[SearchResult] = []
-        for h in hits:
-            d = by_id.get(h.doc_id)
-            if d is None:
-                continue
-            out.append(
+        return self.search_batch([query], [limit])[0]
+
+    def search_batch(
+        self, queries: list[str], limits: list[int]
+    ) -> list[list[SearchResult]]:
+        """Run several queries with one encode pass, index scan and row fetch."""
+        q = batch_encode_queries(queries)
+        hits_per_query = self.index.search_batch(q, limits)
+
+        wanted = {h.doc_id for hits in hits_per_query for h in hits}
+        if not wanted:
+            return [[] for _ in hits_per_query]
+        # Plain Core rows for the top-k: no ORM identity map, no basin, and
+        # only the snippet's worth of text leaves the database.
+        stmt = select(
+            Document.doc_id,
+            Document.url,
+            Document.title,
+            func.substr(Document.text, 1, SNIPPET_CHARS).label("snippet"),
+        ).where(Document.doc_id.in_(wanted))
+        with self.store.engine.connect() as conn:
+            by_id = {row.doc_id: row for row in conn.execute(stmt)}
+
+        return [
+            [
                 SearchResult(
-                    doc_id=d.doc_id,
-                    url=d.url,
-                    title=d.title,
-                    snippet=(d.text or "")[:220],
+                    doc_id=row.doc_id,
+                    url=row.url,
+                    title=row.title,
+                    snippet=row.snippet or "",
                     distance=h.distance,
                 )
-            )
-        return out
+                for h in hits
+                if (row := by_id.get(h.doc_id)) is not None
+            ]
+            for hits in hits_per_query
+        ]
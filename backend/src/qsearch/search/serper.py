@@ -4,6 +4,7 @@ Serper.dev search integration for hybrid web search.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import hashlib
 import logging
@@ -15,7 +16,7 @@ import httpx
 _log = logging.getLogger("qsearch.serper")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SerperResult:
     title: str
     url: str
@@ -23,13 +24,31 @@ class SerperResult:
     position: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SerperResponse:
     query: str
     results: list[SerperResult]
     search_time: float
 
 
+def _parse_response(data: dict, query: str, num_results: int) -> SerperResponse:
+    results = [
+        SerperResult(
+            title=item.get("title", ""),
+            url=item.get("link", ""),
+            snippet=item.get("snippet", ""),
+            position=i + 1,
+        )
+        for i, item in enumerate(data.get("organic", [])[:num_results])
+    ]
+    search_time = data.get("searchParameters", {}).get("timeUsed", 0.0)
+    return SerperResponse(
+        query=query,
+        results=results,
+        search_time=float(search_time) if search_time else 0.0,
+    )
+
+
 class SerperClient:
     """Client for Serper.dev Google Search API."""
 
@@ -39,11 +58,57 @@ class SerperClient:
         self.api_key = api_key or os.environ.get("SERPER_API_KEY", "")
         if not self.api_key:
             _log.warning("SERPER_API_KEY not set - web search disabled")
+        # Created on first use in each event loop, since its connections
+        # belong to the loop that opened them
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Separate pooled client for search_sync, which may run outside any loop
+        self._sync: Optional[httpx.Client] = None
 
     @property
     def enabled(self) -> bool:
         return bool(self.api_key)
 
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            self._client = httpx.AsyncClient(http2=True, timeout=30.0)
+            self._client_loop = loop
+        return self._client
+
+    def _sync_client(self) -> httpx.Client:
+        if self._sync is None or self._sync.is_closed:
+            self._sync = httpx.Client(http2=True, timeout=30.0)
+        return self._sync
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync is not None:
+            self._sync.close()
+            self._sync = None
+
+    def _request(
+        self, query: str, num_results: int, country: str, language: str
+    ) -> dict:
+        return {
+            "headers": {
+                "X-API-KEY": self.api_key,
+                "Content-Type": "application/json",
+            },
+            "json": {
+                "q": query,
+                "num": num_results,
+                "gl": country,
+                "hl": language,
+            },
+        }
+
     async def search(
         self,
         query: str,
@@ -57,41 +122,11 @@ class SerperClient:
             return SerperResponse(query=query, results=[], search_time=0.0)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.BASE_URL,
-                    headers={
-                        "X-API-KEY": self.api_key,
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "q": query,
-                        "num": num_results,
-                        "gl": country,
-                        "hl": language,
-                    },
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                results = []
-                organic = data.get("organic", [])
-                for i, item in enumerate(organic[:num_results]):
-                    results.append(
-                        SerperResult(
-                            title=item.get("title", ""),
-                            url=item.get("link", ""),
-                            snippet=item.get("snippet", ""),
-                            position=i + 1,
-                        )
-                    )
-
-                search_time = data.get("searchParameters", {}).get("timeUsed", 0.0)
-                return SerperResponse(
-                    query=query,
-                    results=results,
-                    search_time=float(search_time) if search_time else 0.0,
-                )
+            response = await self._async_client().post(
+                self.BASE_URL, **self._request(query, num_results, country, language)
+            )
+            response.raise_for_status()
+            return _parse_response(response.json(), query, num_results)
 
         except httpx.HTTPStatusError as e:
             _log.error("Serper API error: %s", e)
@@ -113,41 +148,11 @@ class SerperClient:
             return SerperResponse(query=query, results=[], search_time=0.0)
 
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    self.BASE_URL,
-                    headers={
-                        "X-API-KEY": self.api_key,
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "q": query,
-                        "num": num_results,
-                        "gl": country,
-                        "hl": language,
-                    },
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                results = []
-                organic = data.get("organic", [])
-                for i, item in enumerate(organic[:num_results]):
-                    results.append(
-                        SerperResult(
-                            title=item.get("title", ""),
-                            url=item.get("link", ""),
-                            snippet=item.get("snippet", ""),
-                            position=i + 1,
-                        )
-                    )
-
-                search_time = data.get("searchParameters", {}).get("timeUsed", 0.0)
-                return SerperResponse(
-                    query=query,
-                    results=results,
-                    search_time=float(search_time) if search_time else 0.0,
-                )
+            response = self._sync_client().post(
+                self.BASE_URL, **self._request(query, num_results, country, language)
+            )
+            response.raise_for_status()
+            return _parse_response(response.json(), query, num_results)
 
         except Exception as e:
             _log.error("Serper search failed: %s", e)
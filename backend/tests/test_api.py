@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+from qsearch.core.encoding import encode_text_to_basin
+from qsearch.index.models import Document, pack_basin
+
+
+def test_search_routes_return_identical_payloads(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'docs.db'}")
+    monkeypatch.setenv("QSEARCH_CACHE_MEMORY_TTL_SECONDS", "0")
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+    from qsearch.api import deps
+
+    for factory in (
+        deps.get_config,
+        deps.get_store,
+        deps.get_orchestrator,
+        deps.get_search_batcher,
+        deps.get_cache,
+    ):
+        factory.cache_clear()
+
+    store = deps.get_store(deps.get_config().db_url)
+    texts = ["quantum fisher information", "cats and dogs", "basin geometry"]
+    with store.session() as s:
+        for i, text in enumerate(texts):
+            s.add(
+                Document(
+                    doc_id=f"d{i}",
+                    url=f"https://example.com/{i}",
+                    title=text,
+                    text=text,
+                    basin=pack_basin(encode_text_to_basin(text)),
+                )
+            )
+
+    from qsearch.api.main import app
+
+    body = {"query": "quantum information", "limit": 2}
+    with TestClient(app) as client:
+        responses = [
+            client.post(path, json=body)
+            for path in ("/search", "/api/search", "/api/v1/search")
+        ]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    payloads = [r.json() for r in responses]
+    assert payloads[0]["count"] == 2
+    assert payloads[0]["results"][0]["doc_id"] == "d0"
+    assert payloads[1:] == [payloads[0], payloads[0]]
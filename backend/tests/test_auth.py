@@ -0,0 +1,44 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.middleware.sessions import SessionMiddleware
+
+
+def test_register_login_me_on_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'auth.db'}")
+
+    from qsearch.api import auth, deps
+
+    for factory in (
+        deps.get_config,
+        deps.get_store,
+        deps.get_async_engine,
+        deps.get_async_sessionmaker,
+    ):
+        factory.cache_clear()
+    monkeypatch.setattr(auth, "_users_table_ready", False)
+    with deps.get_store(deps.get_config().db_url).session() as session:
+        auth.ensure_users_table(session)
+
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key="test-secret")
+    app.include_router(auth.router)
+    creds = {"email": "a@example.com", "password": "hunter22"}
+    with TestClient(app) as client:
+        r = client.post("/api/v1/auth/register", json=creds)
+        assert r.status_code == 200
+        assert client.post("/api/v1/auth/register", json=creds).status_code == 400
+        client.cookies.clear()
+
+        bad = {**creds, "password": "wrong-password"}
+        assert client.post("/api/v1/auth/login", json=bad).status_code == 401
+        r = client.post("/api/v1/auth/login", json=creds)
+        assert r.status_code == 200
+        token = r.json()["access_token"]
+
+        me = client.get("/api/v1/auth/me").json()
+        assert me["authenticated"] is True
+        assert me["user"]["email"] == "a@example.com"
+        assert me["user"]["created_at"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.cookies.clear()
+        assert client.get("/api/v1/auth/me", headers=headers).json() == me
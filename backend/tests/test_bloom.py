@@ -0,0 +1,24 @@
+from qsearch.bloom import BloomFilter, ScalableBloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"https://example.com/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_hits = sum(f"https://other.org/{i}" in bloom for i in range(1000))
+    assert false_hits < 50
+
+
+def test_scalable_bloom_filter_grows_past_initial_capacity():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    keys = [f"https://example.com/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert len(bloom) == 1000
+    false_hits = sum(f"https://other.org/{i}" in bloom for i in range(1000))
+    assert false_hits < 50
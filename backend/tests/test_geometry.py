@@ -3,7 +3,9 @@ import numpy as np
 from qsearch.core.constants import KAPPA_STAR
 from qsearch.core.encoding import encode_text_to_basin
 from qsearch.core.geometry import (
+    basin_to_sqrt_simplex,
     fisher_rao_distance,
+    fisher_rao_distance_fast,
     measure_kappa_from_basin,
     measure_phi_from_basin,
 )
@@ -21,6 +23,16 @@ def test_fisher_rao_distance_is_symmetric_and_non_negative():
     assert np.isclose(dab, dba)
 
 
+def test_fisher_rao_distance_fast_matches_on_sqrt_simplex_embedding():
+    a = encode_text_to_basin("quantum information geometry")
+    b = encode_text_to_basin("cats and dogs")
+
+    fast = fisher_rao_distance_fast(basin_to_sqrt_simplex(a), basin_to_sqrt_simplex(b))
+
+    # Equal up to the eps smoothing inside fisher_rao_distance's square roots
+    assert np.isclose(fast, fisher_rao_distance(a, b), atol=0.05)
+
+
 def test_measure_phi_from_basin_in_range():
     x = encode_text_to_basin("hello world")
     phi = measure_phi_from_basin(x)
@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+
+from qsearch.html import extract_title_and_text, fetch_capped
+
+PAGE = "<html><head><title>Café</title></head><body><p>Crème brûlée</p></body></html>"
+
+
+def _fetch(content_type: str, body: bytes, max_bytes: int = 1024) -> str:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": content_type}, content=body)
+
+    async def run() -> str:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_capped(client, "http://example.com/", max_bytes)
+
+    return asyncio.run(run())
+
+
+def test_fetch_capped_decodes_with_the_header_charset():
+    page = _fetch("text/html; charset=iso-8859-1", PAGE.encode("latin-1"))
+    assert extract_title_and_text(page) == ("Café", "Crème brûlée")
+
+
+def test_fetch_capped_defaults_to_utf8():
+    page = _fetch("text/html", PAGE.encode())
+    assert extract_title_and_text(page) == ("Café", "Crème brûlée")
+
+
+def test_fetch_capped_replaces_a_character_split_by_the_cap():
+    body = "é".encode() * 4
+    assert _fetch("text/html; charset=utf-8", body, max_bytes=3) == "é�"
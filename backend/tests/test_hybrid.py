@@ -0,0 +1,66 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from qsearch.search.hybrid import HybridSearchOrchestrator
+
+PAGE = b"<html><body><p>basin geometry from the fetched page</p></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled connections outlive a request
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        host, port = self.server.server_address
+        body = json.dumps(
+            {
+                "organic": [
+                    {
+                        "title": "Basins",
+                        "link": f"http://{host}:{port}/page",
+                        "snippet": "snippet only",
+                    }
+                ]
+            }
+        ).encode()
+        self._send(body, "application/json")
+
+    def do_GET(self):
+        self._send(PAGE, "text/html; charset=utf-8")
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_search_sync_can_be_called_repeatedly(local_server):
+    hybrid = HybridSearchOrchestrator(serper_api_key="test", cache=None)
+    hybrid.serper.BASE_URL = f"{local_server}/search"
+
+    # Each call runs in a fresh event loop; pooled clients from the previous
+    # one must not be reused after it closed
+    for _ in range(2):
+        results = hybrid.search_sync("basin geometry", limit=1)
+        assert [r.title for r in results] == ["Basins"]
+        assert results[0].content == "basin geometry from the fetched page"
@@ -0,0 +1,58 @@
+import sqlite3
+
+from sqlalchemy import event, func, select
+
+from qsearch.core.encoding import encode_text_to_basin
+from qsearch.crawler.pipelines import SqlAlchemyPipeline
+from qsearch.index.models import Document, pack_basin
+
+
+def _item(i: int, title: str = "") -> dict:
+    text = f"page {i}"
+    return {
+        "doc_id": f"d{i}",
+        "url": f"https://example.com/{i}",
+        "title": title,
+        "text": text,
+        "basin": pack_basin(encode_text_to_basin(text)),
+        "phi": 0.5,
+    }
+
+
+def _titles(pipeline: SqlAlchemyPipeline) -> dict[str, str]:
+    with pipeline.store.session() as s:
+        return dict(s.execute(select(Document.doc_id, Document.title)).all())
+
+
+def test_pipeline_flushes_on_batch_size_and_close(tmp_path):
+    pipeline = SqlAlchemyPipeline(
+        f"sqlite:///{tmp_path / 'docs.db'}", batch_size=3, flush_seconds=3600
+    )
+    for i in range(2):
+        pipeline.process_item(_item(i), spider=None)
+    assert _titles(pipeline) == {}
+
+    # The third item fills the batch; the repeated doc_id keeps its last row
+    pipeline.process_item(_item(0, title="rewritten"), spider=None)
+    assert _titles(pipeline) == {"d0": "rewritten", "d1": ""}
+
+    pipeline.process_item(_item(2), spider=None)
+    assert "d2" not in _titles(pipeline)
+    pipeline.close_spider(spider=None)
+    assert _titles(pipeline) == {"d0": "rewritten", "d1": "", "d2": ""}
+
+
+def test_pipeline_batch_fits_old_sqlite_variable_limit(tmp_path):
+    pipeline = SqlAlchemyPipeline(f"sqlite:///{tmp_path / 'docs.db'}", batch_size=500)
+    engine = pipeline.store.engine
+
+    @event.listens_for(engine, "connect")
+    def _old_sqlite_limit(dbapi_conn, _record):
+        # SQLITE_MAX_VARIABLE_NUMBER on builds before SQLite 3.32
+        dbapi_conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    engine.dispose()
+    for i in range(500):
+        pipeline.process_item(_item(i), spider=None)
+    with pipeline.store.session() as s:
+        assert s.scalar(select(func.count()).select_from(Document)) == 500
@@ -0,0 +1,188 @@
+import threading
+
+import numpy as np
+import pytest
+
+from qsearch.core.constants import BASIN_DIM
+from qsearch.core.encoding import encode_text_to_basin
+from qsearch.core.metrics import basin_distance
+from qsearch.index.basin_index import BasinIndex
+from qsearch.index.models import Document, pack_basin
+from qsearch.index.storage import DocumentStore
+from qsearch.search.orchestrator import SearchOrchestrator
+
+
+def test_search_batch_matches_per_document_distance(tmp_path):
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    texts = ["quantum fisher information", "cats and dogs", "basin geometry", ""]
+    with store.session() as s:
+        for i, text in enumerate(texts):
+            s.add(
+                Document(
+                    doc_id=f"d{i}",
+                    url=f"https://example.com/{i}",
+                    title=text,
+                    text=text,
+                    basin=pack_basin(encode_text_to_basin(text)),
+                )
+            )
+
+    orchestrator = SearchOrchestrator(store=store)
+    queries = ["quantum information", "dogs"]
+    batched = orchestrator.search_batch(queries, [2, 4])
+
+    assert [len(r) for r in batched] == [2, 4]
+    for query, results in zip(queries, batched, strict=True):
+        q = encode_text_to_basin(query)
+        expected = sorted(basin_distance(q, encode_text_to_basin(t)) for t in texts)
+        got = [r.distance for r in results]
+        assert got == [pytest.approx(d, abs=1e-5) for d in expected[: len(got)]]
+        assert results == orchestrator.search(query, limit=len(results))
+
+
+def test_int8_index_tracks_float_distances(tmp_path):
+    rng = np.random.default_rng(0)
+    basins = rng.standard_normal((200, BASIN_DIM)).astype(np.float32)
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    with store.session() as s:
+        for i, basin in enumerate(basins):
+            s.add(
+                Document(
+                    doc_id=f"d{i}",
+                    url=f"https://example.com/{i}",
+                    title="",
+                    text="",
+                    basin=pack_basin(basin),
+                )
+            )
+
+    exact = BasinIndex(store)
+    int8 = BasinIndex(store, quantize=True)
+    query = rng.standard_normal((3, BASIN_DIM)).astype(np.float32)
+    for a, b in zip(
+        exact.search_batch(query, [200] * 3),
+        int8.search_batch(query, [200] * 3),
+        strict=True,
+    ):
+        want = {h.doc_id: h.distance for h in a}
+        assert all(abs(h.distance - want[h.doc_id]) < 2e-2 for h in b)
+    assert int8.nbytes < exact.nbytes / 3
+    assert exact._M.ctypes.data % 64 == 0 and int8._M.ctypes.data % 64 == 0
+    # add() grows the exactly-sized loaded matrix into a new buffer
+    for index in (exact, int8):
+        index.add("extra", query[0])
+        assert index._M.ctypes.data % 64 == 0
+
+
+def test_index_reloads_when_a_document_is_rewritten(tmp_path):
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    with store.session() as s:
+        for i, text in enumerate(["cats and dogs", "basin geometry"]):
+            s.add(
+                Document(
+                    doc_id=f"d{i}",
+                    url=f"https://example.com/{i}",
+                    basin=pack_basin(encode_text_to_basin(text)),
+                )
+            )
+
+    index = BasinIndex(store, refresh_seconds=0.0)
+    query = encode_text_to_basin("quantum fisher information")
+    assert index.search(query, limit=1)[0].doc_id != "d0"
+
+    # Same row count, new basin: only updated_at reveals the change
+    with store.session() as s:
+        s.get(Document, "d0").basin = query
+    assert index.search(query, limit=1)[0].doc_id == "d0"
+
+
+def test_index_cold_starts_from_snapshot(tmp_path):
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    with store.session() as s:
+        for i, text in enumerate(["cats and dogs", "basin geometry"]):
+            s.add(
+                Document(
+                    doc_id=f"d{i}",
+                    url=f"https://example.com/{i}",
+                    basin=pack_basin(encode_text_to_basin(text)),
+                )
+            )
+    snapshots = tmp_path / "snapshots"
+    query = encode_text_to_basin("geometry")
+    first = BasinIndex(store, snapshot_dir=str(snapshots), refresh_seconds=0.0)
+    expected = first.search(query, limit=2)
+    # Written off the search path, so wait for the background writer
+    first._snapshot_writer.join()
+
+    warm = BasinIndex(store, snapshot_dir=str(snapshots))
+    warm.reload()
+    assert isinstance(warm._M, np.memmap)
+    assert warm.search(query, limit=2) == expected
+
+    # A snapshot from an older store version is ignored
+    with store.session() as s:
+        s.get(Document, "d0").basin = query
+    stale = BasinIndex(store, snapshot_dir=str(snapshots))
+    stale.reload()
+    assert not isinstance(stale._M, np.memmap)
+    assert stale.search(query, limit=1)[0].doc_id == "d0"
+
+    # A warm reload within snapshot_seconds of the last write does not rewrite it
+    stale._snapshot_writer.join()
+    pointer = (snapshots / "f32.current").read_text()
+    version = first._version
+    with store.session() as s:
+        s.get(Document, "d1").basin = query
+    first.search(query, limit=1)
+    assert first._version != version
+    assert not first._snapshot_writer.is_alive()
+    assert (snapshots / "f32.current").read_text() == pointer
+
+
+def test_ann_index_follows_store_changes(tmp_path):
+    pytest.importorskip("usearch")
+    rng = np.random.default_rng(0)
+    basins = rng.standard_normal((300, BASIN_DIM)).astype(np.float32)
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    with store.session() as s:
+        for i, basin in enumerate(basins):
+            s.add(Document(doc_id=f"d{i}", url=f"https://example.com/{i}", basin=basin))
+
+    exact = BasinIndex(store)
+    ann = BasinIndex(store, ann=True, refresh_seconds=0.0)
+    hit = ann.search(basins[7], limit=1)[0]
+    assert hit == exact.search(basins[7], limit=1)[0]
+    assert hit.doc_id == "d7"
+
+    # Rewritten rows are re-inserted into the graph, deleted ones leave it
+    with store.session() as s:
+        s.get(Document, "d3").basin = -basins[7]
+        s.delete(s.get(Document, "d7"))
+    assert ann.search(-basins[7], limit=1)[0].doc_id == "d3"
+    assert "d7" not in {h.doc_id for h in ann.search(basins[7], limit=20)}
+
+
+def test_ann_index_serves_added_documents(tmp_path):
+    pytest.importorskip("usearch")
+    rng = np.random.default_rng(1)
+    basins = rng.standard_normal((301, BASIN_DIM)).astype(np.float32)
+    store = DocumentStore(f"sqlite:///{tmp_path / 'docs.db'}")
+    with store.session() as s:
+        for i, basin in enumerate(basins[:300]):
+            s.add(Document(doc_id=f"d{i}", url=f"https://example.com/{i}", basin=basin))
+
+    ann = BasinIndex(store, ann=True, refresh_seconds=3600.0)
+    ann.reload()
+    with store.session() as s:
+        s.add(Document(doc_id="new", url="https://example.com/new", basin=basins[300]))
+    ann.add("new", basins[300])
+    assert ann.search(basins[300], limit=1)[0].doc_id == "new"
+
+    # Concurrent reloads each see the added row already in the graph
+    threads = [threading.Thread(target=ann.reload) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(ann._graph) == 301
+    assert ann.search(basins[300], limit=1)[0].doc_id == "new"
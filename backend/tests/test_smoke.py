@@ -1,5 +1,7 @@
-from qsearch.core.encoding import encode_text_to_basin
-from qsearch.core.metrics import basin_distance
+import numpy as np
+
+from qsearch.core.encoding import encode_query, encode_text_to_basin
+from qsearch.core.metrics import basin_distance, basin_distances
 
 
 def test_basin_distance_smoke():
@@ -10,3 +12,19 @@ def test_basin_distance_smoke():
     dab = basin_distance(a, b)
     dac = basin_distance(a, c)
     assert dab <= dac
+
+
+def test_basin_distances_matches_basin_distance():
+    q = encode_text_to_basin("quantum information geometry")
+    texts = ["quantum fisher information", "cats and dogs", ""]
+    rows = np.stack([encode_text_to_basin(t) for t in texts])
+
+    expected = [basin_distance(q, row) for row in rows]
+    assert np.allclose(basin_distances(q, rows), expected)
+
+
+def test_encode_query_is_memoized_and_read_only():
+    a = encode_query("quantum fisher information")
+    assert np.array_equal(a, encode_text_to_basin("quantum fisher information"))
+    assert not a.flags.writeable
+    assert encode_query("quantum fisher information").base is a.base
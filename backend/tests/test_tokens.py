@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from qsearch.api import deps, tokens
+from qsearch.api.tokens import issue_token, revoke_token, verify_token
+
+
+def test_access_token_round_trip_and_revocation():
+    user = {"user_id": "u-1", "email": "a@example.com", "name": "a"}
+    token = issue_token(7, user)
+
+    claims = asyncio.run(verify_token(token))
+    assert claims is not None
+    assert claims["uid"] == 7
+    assert claims["user"] == user
+
+    tampered = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    assert asyncio.run(verify_token(tampered)) is None
+
+    asyncio.run(revoke_token(token))
+    assert asyncio.run(verify_token(token)) is None
+
+
+def test_multiple_workers_require_a_session_secret(monkeypatch):
+    monkeypatch.delenv("QSEARCH_SESSION_SECRET", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    deps.get_config.cache_clear()
+    tokens._signing_key.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="QSEARCH_SESSION_SECRET"):
+            tokens.init_signing_key()
+
+        monkeypatch.setenv("QSEARCH_SESSION_SECRET", "shared")
+        deps.get_config.cache_clear()
+        tokens.init_signing_key()
+    finally:
+        deps.get_config.cache_clear()
+        tokens._signing_key.cache_clear()
+        tokens._verify_key.cache_clear()